@@ -3,12 +3,79 @@ tests to run and debug your minimax and alphabeta agents locally.  The test
 cases used by the project assistant are not public.
 """
 
+import io
+import json
+import math
+import os
+import random
+import tempfile
+import timeit
 import unittest
 
+import benchmark
 import isolation
 import game_agent
+import competition_agent
+import opening_book
+import perft
+import sample_players
+import tournament
 
+from copy import deepcopy
 from importlib import reload
+from unittest import mock
+
+
+class StockBoard:
+    """Wrap a board to expose only the interface of the stock project board
+    that `game_agent.py` is graded against (no `mobility()`, `hash()` or
+    `shuffle` argument).
+    """
+    def __init__(self, board):
+        self._board = board
+
+    def __getattr__(self, name):
+        if name in ("mobility", "weighted_mobility", "hash", "push", "pop"):
+            raise AttributeError(name)
+        return getattr(self._board, name)
+
+    def get_legal_moves(self, player=None):
+        return self._board.get_legal_moves(player)
+
+    def copy(self):
+        return StockBoard(self._board.copy())
+
+    def forecast_move(self, move):
+        return StockBoard(self._board.forecast_move(move))
+
+
+# Calls to counted_score() made by this process
+SCORE_CALLS = []
+
+
+def counted_score(game, player):
+    """custom_score_2 that counts its calls in the calling process."""
+    SCORE_CALLS.append(1)
+    return game_agent.custom_score_2(game, player)
+
+
+class SeededPlayer:
+    """Test player whose moves depend only on the state of the random module
+    (which `tournament.play_game()` seeds for every game). With `mode`
+    "forfeit" it returns an illegal move, and with "timeout" it waits for
+    the timer to run out.
+    """
+    def __init__(self, mode=None):
+        self.mode = mode
+
+    def get_move(self, game, time_left):
+        if self.mode == "forfeit":
+            return (-1, -1)
+        if self.mode == "timeout":
+            while time_left() >= 0:
+                pass
+        moves = sorted(game.get_legal_moves())
+        return random.choice(moves) if moves else (-1, -1)
 
 
 class IsolationTest(unittest.TestCase):
@@ -20,6 +87,902 @@ class IsolationTest(unittest.TestCase):
         self.player2 = "Player2"
         self.game = isolation.Board(self.player1, self.player2)
 
+    def test_bitboard_matches_board(self):
+        """ BitBoard generates the same game states as the list-based Board """
+        random.seed(0)
+        bitboard = isolation.BitBoard(self.player1, self.player2)
+        while True:
+            moves = sorted(self.game.get_legal_moves())
+            self.assertEqual(moves, sorted(bitboard.get_legal_moves()))
+            self.assertEqual(self.game.to_string(), bitboard.to_string())
+            self.assertEqual(self.game.hash(), bitboard.hash())
+            for player in (self.player1, self.player2):
+                self.assertEqual(self.game.get_player_location(player),
+                                 bitboard.get_player_location(player))
+                self.assertEqual(self.game.utility(player),
+                                 bitboard.utility(player))
+            if not moves:
+                break
+            move = random.choice(moves)
+            self.game.apply_move(move)
+            bitboard = bitboard.forecast_move(move)
+
+    def test_benchmark_smoke(self):
+        """ The benchmark script runs every benchmark on both boards (with a
+        tiny position set) and writes its results
+        """
+        sizes = dict(NUM_POSITIONS=3, NUMBER=1, NUM_SEARCH_POSITIONS=2,
+                     MINIMAX_DEPTH=1, ALPHABETA_DEPTH=1)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "results.json")
+            for board in ("board", "bitboard"):
+                argv = ["benchmark.py", "--board", board, "--repeat", "1",
+                        "--output", path]
+                with mock.patch.multiple(benchmark, **sizes), \
+                        mock.patch("sys.argv", argv), mock.patch("sys.stdout"):
+                    benchmark.main()
+                with open(path) as results:
+                    data = json.load(results)
+                self.assertEqual(data["board"], board)
+                names = [result["name"] for result in data["results"]]
+                self.assertIn("mobility", names)
+                self.assertIn("alphabeta_depth_1", names)
+                for name, _ in benchmark.SCORERS:
+                    self.assertIn(name, names)
+                for result in data["results"]:
+                    self.assertGreater(result["calls"], 0)
+
+    def test_perft_counts_match(self):
+        """ Every board implementation and walk mode has the same perft counts
+        """
+        self.assertEqual(perft.perft(self.game, 2), 49 * 48)
+        expected = None
+        for board_class in (isolation.Board, isolation.BitBoard):
+            for in_place in (False, True):
+                game = perft.build(board_class, [(2, 2), (1, 3)], 5, 5)
+                results = perft.divide(game, 5, in_place)
+                self.assertEqual(sum(count for _, count in results),
+                                 perft.perft(game, 5, in_place))
+                if expected is None:
+                    expected = results
+                self.assertEqual(results, expected)
+
+    def test_board_slots_and_copy(self):
+        """ Boards have no instance dict, copies are independent, and
+        subclasses without slots can still add attributes
+        """
+        for board_class in (isolation.Board, isolation.BitBoard):
+            game = board_class(self.player1, self.player2)
+            self.assertFalse(hasattr(game, "__dict__"))
+            game.apply_move((2, 3))
+            game.apply_move((4, 4))
+            game.shuffle_moves = False
+            copy = game.copy()
+            self.assertIs(type(copy), board_class)
+            self.assertEqual(copy.to_string(), game.to_string())
+            self.assertEqual(copy.hash(), game.hash())
+            self.assertFalse(copy.shuffle_moves)
+            copy.push((3, 1))
+            self.assertNotEqual(copy.to_string(), game.to_string())
+            copy.pop()
+            self.assertEqual(copy.hash(), game.hash())
+
+        class TaggedBoard(isolation.Board):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                self.tag = "root"
+
+        game = TaggedBoard(self.player1, self.player2)
+        game.apply_move((2, 3))
+        self.assertEqual(game.tag, "root")
+        self.assertEqual(game.forecast_move((4, 4)).get_player_location(self.player2), (4, 4))
+
+    def test_mobility_counts(self):
+        """ Mobility counts match the legal move lists on both boards """
+        for board_class in (isolation.Board, isolation.BitBoard):
+            game = board_class(self.player1, self.player2)
+            self.assertEqual(game.mobility(), 49)
+            self.assertEqual(game.weighted_mobility(self.player2), 49)
+            directions = [(-2, -1), (-2, 1), (-1, -2), (-1, 2),
+                          (1, -2), (1, 2), (2, -1), (2, 1)]
+            random.seed(3)
+            while True:
+                for player in (self.player1, self.player2):
+                    moves = game.get_legal_moves(player)
+                    self.assertEqual(game.mobility(player), len(moves))
+                    if game.get_player_location(player) is not None:
+                        second = set((r + dr, c + dc) for r, c in moves
+                                     for dr, dc in directions)
+                        second &= set(game.get_blank_spaces())
+                        self.assertEqual(game.weighted_mobility(player), len(second))
+                moves = game.get_legal_moves()
+                if not moves:
+                    break
+                game.apply_move(random.choice(moves))
+
+    def test_scores_run_on_the_stock_board(self):
+        """ The graded evaluation functions only use the stock board API """
+        game = isolation.Board(self.player1, self.player2)
+        game.apply_move((2, 3))
+        game.apply_move((4, 4))
+        for score in (game_agent.custom_score, game_agent.custom_score_2,
+                      game_agent.custom_score_3):
+            for player in (self.player1, self.player2):
+                self.assertEqual(score(StockBoard(game), player), score(game, player))
+
+    def test_agents_run_on_the_stock_board(self):
+        """ The graded agents search boards with only the stock board API """
+        for agent in (game_agent.MinimaxPlayer(), game_agent.AlphaBetaPlayer(),
+                      game_agent.AlphaBetaPlayer(search_mode="pvs")):
+            board = isolation.Board(agent, self.player2)
+            board.apply_move((2, 3))
+            board.apply_move((4, 4))
+            game = StockBoard(board)
+            agent.time_left = lambda: 1e4
+            if isinstance(agent, game_agent.MinimaxPlayer):
+                self.assertIn(agent.minimax(game, 2), board.get_legal_moves())
+            else:
+                self.assertIn(agent.alphabeta(game, 2), board.get_legal_moves())
+            end = timeit.default_timer() + 0.05
+            move = agent.get_move(game, lambda: 1000 * (end - timeit.default_timer()))
+            self.assertIn(move, board.get_legal_moves())
+
+    def test_knight_move_tables(self):
+        """ Precomputed knight tables match the in-bounds L-shaped moves """
+        width, height = 5, 4
+        coords = isolation.cell_coords(width, height)
+        moves = isolation.knight_moves(width, height)
+        masks = isolation.knight_masks(width, height)
+        for idx, (r, c) in enumerate(coords):
+            expected = {(r + dr, c + dc) for dr in (-2, -1, 1, 2)
+                        for dc in (-2, -1, 1, 2) if abs(dr) != abs(dc) and
+                        0 <= r + dr < height and 0 <= c + dc < width}
+            self.assertEqual({coords[dest] for dest in moves[idx]}, expected)
+            self.assertEqual(masks[idx], sum(1 << dest for dest in moves[idx]))
+        self.assertIs(moves, isolation.knight_moves(width, height))
+
+    def test_push_pop_restores_board(self):
+        """ pop() undoes push() exactly on both board implementations """
+        for board in (self.game, isolation.BitBoard(self.player1, self.player2)):
+            board.apply_move((3, 3))
+            states = []
+            for _ in range(6):
+                moves = board.get_legal_moves()
+                if not moves:
+                    break
+                states.append((board.to_string(), board.hash(), board.move_count,
+                               board.active_player, sorted(moves)))
+                board.push(moves[0])
+            while states:
+                board.pop()
+                self.assertEqual(states.pop(), (board.to_string(), board.hash(),
+                                                board.move_count, board.active_player,
+                                                sorted(board.get_legal_moves())))
+
+    def test_in_place_search_matches_copy_search(self):
+        """ In-place alphabeta search returns the same values as copy search """
+        for depth in range(1, 4):
+            values = []
+            for in_place in (False, True):
+                agent = game_agent.AlphaBetaPlayer(score_fn=game_agent.custom_score_2,
+                                                   in_place=in_place)
+                agent.time_left = lambda: 1e4
+                game = isolation.Board(agent, self.player2)
+                game.apply_move((2, 3))
+                game.apply_move((4, 4))
+                before = game.to_string()
+                values.append(agent.max_value(game, depth, float("-inf"), float("inf")))
+                self.assertEqual(before, game.to_string())
+            self.assertEqual(values[0], values[1])
+
+    def test_unshuffled_moves_are_deterministic(self):
+        """ Legal moves come back in a fixed order when shuffling is off """
+        for board in (self.game, isolation.BitBoard(self.player1, self.player2)):
+            board.apply_move((3, 3))
+            board.apply_move((0, 0))
+            board.shuffle_moves = False
+            state = random.getstate()
+            moves = board.get_legal_moves()
+            self.assertEqual(random.getstate(), state)
+            self.assertEqual(moves, board.copy().get_legal_moves())
+            self.assertEqual(moves, board.get_legal_moves(shuffle=False))
+            self.assertEqual(sorted(moves), sorted(board.get_legal_moves(shuffle=True)))
+
+    def test_zobrist_hash_identifies_transpositions(self):
+        """ Move orders reaching the same state produce the same hash """
+        first = isolation.Board(self.player1, self.player2)
+        second = isolation.Board(self.player1, self.player2)
+        for move in [(0, 0), (6, 6), (1, 2), (4, 5), (3, 3)]:
+            first.apply_move(move)
+        for move in [(3, 3), (6, 6), (1, 2), (4, 5), (0, 0)]:
+            second.apply_move(move)
+        # Same blocked cells, but player 1 ends on a different cell
+        self.assertNotEqual(first.hash(), second.hash())
+
+        third = isolation.Board(self.player1, self.player2)
+        for move in [(1, 2), (6, 6), (0, 0), (4, 5), (3, 3)]:
+            third.apply_move(move)
+        self.assertEqual(first.hash(), third.hash())
+        self.assertNotEqual(first.hash(), self.game.hash())
+
+    def test_transposition_table_preserves_values(self):
+        """ Alpha-beta with a transposition table finds the same values while
+        evaluating no more leaves than the plain search
+        """
+        def counting(calls):
+            def score(game, player):
+                calls.append(1)
+                return game_agent.custom_score_2(game, player)
+            return score
+
+        for depth in range(1, 5):
+            results = []
+            for tt in (None, game_agent.TranspositionTable(1000)):
+                calls = []
+                agent = game_agent.AlphaBetaPlayer(score_fn=counting(calls), tt=tt)
+                agent.time_left = lambda: 1e4
+                game = isolation.Board(agent, self.player2)
+                game.shuffle_moves = False
+                game.apply_move((2, 3))
+                game.apply_move((4, 4))
+                value = agent.max_value(game, depth, float("-inf"), float("inf"))
+                results.append((value, len(calls)))
+            self.assertEqual(results[0][0], results[1][0])
+            self.assertLessEqual(results[1][1], results[0][1])
+
+    def test_transposition_table_replacement(self):
+        """ Depth-preferred slots keep deeper entries from the same search """
+        table = game_agent.TranspositionTable(1)
+        table.store(1, 3, 1., table.EXACT, (0, 0))
+        table.store(2, 1, 2., table.EXACT, (1, 1))
+        self.assertIsNone(table.lookup(2))
+        self.assertEqual(table.lookup(1), (3, 1., table.EXACT, (0, 0)))
+        table.new_search()
+        table.store(2, 1, 2., table.EXACT, (1, 1))
+        self.assertEqual(table.lookup(2), (1, 2., table.EXACT, (1, 1)))
+
+        table = game_agent.TranspositionTable(1, replacement="always")
+        table.store(1, 3, 1., table.EXACT, (0, 0))
+        table.store(2, 1, 2., table.EXACT, (1, 1))
+        self.assertIsNone(table.lookup(1))
+        self.assertEqual(len(table), 1)
+
+    def test_move_ordering_preserves_values(self):
+        """ Iterative deepening with move ordering finds the same values and
+        best moves while evaluating fewer leaves
+        """
+        results = []
+        for move_ordering in (False, True):
+            calls = []
+
+            def score(game, player):
+                calls.append(1)
+                return game_agent.custom_score_2(game, player)
+
+            agent = game_agent.AlphaBetaPlayer(score_fn=score, move_ordering=move_ordering)
+            agent.time_left = lambda: 1e4
+            game = isolation.Board(agent, self.player2)
+            game.shuffle_moves = False
+            game.apply_move((2, 3))
+            game.apply_move((4, 4))
+            values = []
+            for depth in range(1, 6):
+                move = agent.alphabeta(game, depth)
+                values.append(agent.min_value(game.forecast_move(move), depth - 1,
+                                              float("-inf"), float("inf")))
+            results.append((values, len(calls)))
+        self.assertEqual(results[0][0], results[1][0])
+        self.assertLess(results[1][1], results[0][1])
+
+    def test_pvs_matches_alphabeta(self):
+        """ PVS search chooses moves with the same minimax value as alphabeta """
+        for options in ({}, {"move_ordering": True},
+                        {"tt": game_agent.TranspositionTable(100)}):
+            agent = game_agent.AlphaBetaPlayer(score_fn=game_agent.custom_score_3,
+                                               search_mode="pvs", **options)
+            agent.time_left = lambda: 1e4
+            game = isolation.Board(agent, self.player2)
+            game.apply_move((2, 3))
+            game.apply_move((4, 4))
+            for depth in range(1, 6):
+                expected = max(agent.min_value(game.forecast_move(m), depth - 1,
+                                               float("-inf"), float("inf"))
+                               for m in game.get_legal_moves())
+                move = agent.pvs(game, depth)
+                self.assertEqual(expected, agent.min_value(
+                    game.forecast_move(move), depth - 1, float("-inf"), float("inf")))
+
+        agent = game_agent.AlphaBetaPlayer(search_mode="pvs")
+        game = isolation.Board(agent, self.player2)
+        game.apply_move((2, 3))
+        game.apply_move((4, 4))
+        end = timeit.default_timer() + 0.05
+        time_left = lambda: 1000 * (end - timeit.default_timer())
+        self.assertIn(agent.get_move(game, time_left), game.get_legal_moves())
+
+    def test_pvs_null_windows_with_real_scores(self):
+        """ PVS finds the alphabeta values with non-integer scores, with and
+        without math.nextafter() for the null windows
+        """
+        def score(game, player):
+            return (sample_players.improved_score(game, player) +
+                    sample_players.center_score(game, player) / 7.)
+
+        for value in (-2.5, -1., 0., 1 / 3., 1.75, float("-inf")):
+            above = game_agent._next_above(value)
+            self.assertGreater(above, value)
+            game_agent._nextafter = None
+            try:
+                fallback = game_agent._next_above(value)
+            finally:
+                reload(game_agent)
+            self.assertGreater(fallback, value)
+            self.assertLessEqual(fallback - value, 2 * (above - value))
+
+        values = []
+        try:
+            for nextafter in (True, False):
+                if not nextafter:
+                    game_agent._nextafter = None
+                agent = game_agent.AlphaBetaPlayer(score_fn=score, search_mode="pvs")
+                agent.time_left = lambda: 1e4
+                game = isolation.Board(agent, self.player2)
+                game.apply_move((2, 3))
+                game.apply_move((4, 4))
+                for depth in range(1, 5):
+                    agent.alphabeta(game, depth)
+                    expected = agent._root_value
+                    agent.pvs(game, depth)
+                    self.assertEqual(expected, agent._root_value)
+                    values.append(expected)
+        finally:
+            reload(game_agent)
+        self.assertTrue(any(value != round(value) for value in values))
+
+    def test_time_manager_stops_early(self):
+        """ The time manager predicts iteration times, stops on proven and
+        forced positions, and keeps a game clock
+        """
+        clock = [100.]
+        manager = game_agent.TimeManager(stable_iterations=None)
+        manager.start(self.game, lambda: clock[0], 10.)
+        self.assertEqual(manager.budget, 90.)
+        for depth, elapsed in enumerate((1., 4.), 1):
+            clock[0] -= elapsed
+            self.assertFalse(manager.stop(depth, (0, 0), 1.))
+        # The next iteration should take 20 * 5 = 100ms but only 65ms of the
+        # budget are left
+        clock[0] -= 20.
+        self.assertTrue(manager.stop(3, (0, 0), 1.))
+        self.assertTrue(manager.stop(4, (0, 0), float("inf")))
+        manager.finish()
+
+        agent = game_agent.AlphaBetaPlayer(time_manager=game_agent.TimeManager())
+        game = isolation.Board(agent, self.player2)
+        game.apply_move((0, 0))
+        game.apply_move((2, 1))
+        self.assertEqual(game.get_legal_moves(), [(1, 2)])
+        self.assertEqual(agent.get_move(game, lambda: 100.), (1, 2))
+        self.assertEqual(agent.depth_reached, 0)
+
+        agents = [game_agent.AlphaBetaPlayer(time_manager=game_agent.TimeManager(500.))
+                  for _ in range(2)]
+        game = isolation.Board(agents[0], agents[1], 5, 5)
+        _, _, termination = game.play(time_limit=None, game_time=500.)
+        self.assertEqual(termination, "illegal move")
+        for agent in agents:
+            self.assertGreater(agent.time_manager.remaining, 0)
+
+        # A game without a turn limit or a game clock would never end
+        with self.assertRaises(ValueError):
+            isolation.Board(agents[0], agents[1]).play(time_limit=None)
+
+    def test_root_split_search_matches_full_search(self):
+        """ Splitting the root moves between searches preserves the value of
+        the best move, and the parallel agent plays legal moves on time
+        """
+        for search_mode in ("alphabeta", "pvs"):
+            agent = game_agent.AlphaBetaPlayer(score_fn=game_agent.custom_score_3,
+                                               search_mode=search_mode,
+                                               tt=game_agent.TranspositionTable(100))
+            search = agent.pvs if search_mode == "pvs" else agent.alphabeta
+            agent.time_left = lambda: 1e4
+            game = isolation.Board(agent, self.player2)
+            game.apply_move((2, 3))
+            game.apply_move((4, 4))
+            legal_moves = game.get_legal_moves()
+            for depth in range(1, 5):
+                search(game, depth)
+                expected = agent._root_value
+                values = []
+                for share in (legal_moves[0::3], legal_moves[1::3], legal_moves[2::3]):
+                    agent._root_moves = share
+                    self.assertIn(search(game, depth), share)
+                    values.append(agent._root_value)
+                agent._root_moves = None
+                self.assertEqual(expected, max(values))
+
+        agent = game_agent.AlphaBetaPlayer(workers=2)
+        try:
+            game = isolation.Board(agent, self.player2)
+            game.apply_move((2, 3))
+            game.apply_move((4, 4))
+            for _ in range(2):
+                end = timeit.default_timer() + 0.15
+                time_left = lambda: 1000 * (end - timeit.default_timer())
+                self.assertIn(agent.get_move(game, time_left), game.get_legal_moves())
+                self.assertGreater(time_left(), 0)
+                self.assertGreater(agent.depth_reached, 0)
+        finally:
+            agent.close()
+
+    def test_parallel_search_stats_and_time_manager(self):
+        """ A parallel search counts the nodes of its helpers and returns
+        within the soft budget of its time manager
+        """
+        manager = game_agent.TimeManager(game_time=2000.)
+        stats = game_agent.SearchStats()
+        agent = game_agent.AlphaBetaPlayer(score_fn=counted_score, workers=2,
+                                           time_manager=manager, stats=stats)
+        try:
+            game = isolation.Board(agent, self.player2)
+            game.apply_move((2, 3))
+            game.apply_move((4, 4))
+            del SCORE_CALLS[:]
+            start = timeit.default_timer()
+            end = start + 1.
+            time_left = lambda: 1000 * (end - timeit.default_timer())
+            self.assertIn(agent.get_move(game, time_left), game.get_legal_moves())
+            elapsed = 1000 * (timeit.default_timer() - start)
+            # The hard limit of the move is three times the budget
+            self.assertLess(elapsed, 2 * manager.budget)
+            self.assertGreater(stats.leaf_evals, len(SCORE_CALLS))
+            self.assertEqual(stats.nodes, stats.expanded + stats.leaf_evals)
+        finally:
+            agent.close()
+
+    def test_aspiration_windows_preserve_values(self):
+        """ Aspiration window passes find the same root values as full-window
+        passes, including after re-searches that widen the window
+        """
+        for search_mode in ("alphabeta", "pvs"):
+            agent = game_agent.AlphaBetaPlayer(score_fn=game_agent.custom_score_3,
+                                               search_mode=search_mode,
+                                               aspiration=0.05, aspiration_growth=2.)
+            agent.time_left = lambda: 1e4
+            search = agent.pvs if search_mode == "pvs" else agent.alphabeta
+            game = isolation.Board(agent, self.player2)
+            game.apply_move((2, 3))
+            game.apply_move((4, 4))
+            previous = None
+            for depth in range(1, 7):
+                search(game, depth)
+                expected = agent._root_value
+                agent._root_value = previous
+                agent._aspiration_search(search, game, depth)
+                self.assertEqual(expected, agent._root_value)
+                previous = expected
+
+    def test_extensions_follow_forced_lines(self):
+        """ Extensions search past the horizon within their budget: with an
+        unlimited budget a depth 1 pass on a small board reaches the end of
+        every line and finds the exact value
+        """
+        for search_mode in ("alphabeta", "pvs"):
+            values = []
+            for options, depth in ((dict(), 1), (dict(extensions=8, extension_budget=0), 1),
+                                   (dict(extensions=8, extension_budget=10 ** 6), 1),
+                                   (dict(), 30)):
+                agent = game_agent.AlphaBetaPlayer(score_fn=sample_players.improved_score,
+                                                   search_mode=search_mode,
+                                                   stats=game_agent.SearchStats(),
+                                                   **options)
+                agent.time_left = lambda: 1e4
+                agent.stats.reset(agent.time_left)
+                search = agent.pvs if search_mode == "pvs" else agent.alphabeta
+                game = isolation.Board(agent, self.player2, 5, 5)
+                game.apply_move((0, 0))
+                game.apply_move((2, 2))
+                search(game, depth)
+                values.append((agent._root_value, agent.stats.extensions))
+            self.assertEqual(values[0], values[1])
+            self.assertEqual(values[0][1], 0)
+            self.assertEqual(values[2][0], values[3][0])
+            self.assertTrue(math.isinf(values[2][0]))
+            self.assertGreater(values[2][1], 0)
+
+        with self.assertRaises(ValueError):
+            game_agent.AlphaBetaPlayer(extensions=0)
+
+    def test_tournament_game_records(self):
+        """ play_game() records the result, moves and times of every game """
+        first = tournament.Agent(SeededPlayer(), "First")
+        second = tournament.Agent(SeededPlayer(), "Second")
+        task = tournament.Task((first, second), 1, [(2, 3), (4, 4)], 7)
+        record = tournament.play_game(task)
+        again = tournament.play_game(task)
+        self.assertEqual(record["history"], again["history"])
+        self.assertEqual(record["winner"], again["winner"])
+        self.assertEqual(record["agents"], ["First", "Second"])
+        self.assertEqual(record["test_seat"], 1)
+        self.assertEqual(record["seed"], 7)
+        self.assertEqual(record["opening"], [[2, 3], [4, 4]])
+        self.assertEqual(record["termination"], "illegal move")
+
+        # Replaying the history leaves the loser without legal moves
+        game = isolation.Board(first.player, second.player)
+        for move in record["opening"] + record["history"]:
+            self.assertIn(tuple(move), game.get_legal_moves())
+            game.apply_move(tuple(move))
+        self.assertFalse(game.get_legal_moves())
+        self.assertIs(game.inactive_player, task.agents[record["winner"]].player)
+
+        # Every call to get_move() is timed, including the losing call
+        self.assertEqual(len(record["move_times"]), len(record["history"]) + 1)
+        self.assertTrue(all(elapsed >= 0 for elapsed in record["move_times"]))
+        self.assertEqual(record["depths"], [None] * len(record["move_times"]))
+        self.assertEqual(record["stats"], [None] * len(record["move_times"]))
+        self.assertNotIn("get_move", vars(first.player))
+
+        for mode in ("forfeit", "timeout"):
+            loser = tournament.Agent(SeededPlayer(mode), "Loser")
+            record = tournament.play_game(tournament.Task((first, loser), 0,
+                                                          [(2, 3), (4, 4)], 7))
+            self.assertEqual(record["termination"], mode)
+            self.assertEqual(record["winner"], 0)
+            self.assertEqual(len(record["history"]), 1)
+            self.assertEqual(len(record["move_times"]), 2)
+        self.assertGreaterEqual(record["move_times"][-1], tournament.TIME_LIMIT)
+
+    def test_tournament_records_search_stats(self):
+        """ play_game() records the search statistics of every move of a
+        stats-enabled agent, and gives back the agent's own instance
+        """
+        stats = game_agent.SearchStats()
+        agent = tournament.Agent(game_agent.AlphaBetaPlayer(
+            score_fn=game_agent.custom_score, stats=stats), "AB_Stats")
+        opponent = tournament.Agent(SeededPlayer(), "Seeded")
+        task = tournament.Task((agent, opponent), 0, [(2, 3), (4, 4)], 5)
+        with mock.patch.object(tournament, "TIME_LIMIT", 40):
+            record = tournament.play_game(task)
+        self.assertEqual(record["termination"], "illegal move")
+        self.assertIs(agent.player.stats, stats)
+        agent_moves = record["stats"][0::2]
+        self.assertTrue(agent_moves)
+        for move_stats, depth in zip(agent_moves, record["depths"][0::2]):
+            self.assertEqual(move_stats["depth_completed"], depth)
+            if not move_stats["expanded"]:
+                # The agent had no legal moves left: each iteration only
+                # visits the root
+                self.assertEqual(move_stats["nodes"], depth)
+                continue
+            self.assertEqual(move_stats["nodes"],
+                             move_stats["expanded"] + move_stats["leaf_evals"])
+        self.assertGreater(agent_moves[0]["nodes"], 0)
+        self.assertEqual(record["stats"][1::2], [None] * len(record["stats"][1::2]))
+
+    def test_tournament_seed_fixes_the_games(self):
+        """ One seed plays the same games with any number of workers """
+        runs = []
+        for workers in (1, 2, 1):
+            cpu_agents = [tournament.Agent(SeededPlayer(), "CPU")]
+            test_agents = [tournament.Agent(SeededPlayer(), "Test_1"),
+                           tournament.Agent(SeededPlayer(), "Test_2")]
+            results = io.StringIO()
+            tournament.play_matches(cpu_agents, test_agents, 2, workers, 11, results)
+            records = [json.loads(line) for line in results.getvalue().splitlines()]
+            for record in records:
+                del record["move_times"]
+            runs.append(sorted(records, key=lambda record: (record["seed"], record["agents"])))
+        self.assertEqual(len(runs[0]), 8)
+        self.assertEqual(runs[0], runs[1])
+        self.assertEqual(runs[0], runs[2])
+        self.assertGreater(len(set(record["seed"] for record in runs[0])), 1)
+
+    def test_eval_cache_matches_score_fn(self):
+        """ Cached evaluations equal the wrapped function and the cache stays
+        within its size
+        """
+        random.seed(6)
+        cache = game_agent.EvalCache(game_agent.custom_score, max_entries=100)
+        games = []
+        for _ in range(40):
+            game = isolation.Board(self.player1, self.player2)
+            for _ in range(random.randint(2, 10)):
+                if not game.get_legal_moves():
+                    break
+                game.apply_move(random.choice(game.get_legal_moves()))
+            games.append(game)
+        for _ in range(2):
+            for game in games:
+                for player in (self.player1, self.player2):
+                    self.assertEqual(cache(game, player),
+                                     game_agent.custom_score(game, player))
+        self.assertEqual(cache.misses + cache.hits, 160)
+        self.assertGreaterEqual(cache.hits, 80)
+        self.assertEqual(len(cache), cache.misses)
+
+        # The most recently used values are kept
+        cache.clear()
+        for game in games[:3]:
+            cache(game, self.player1)
+        cache.max_entries = 3
+        cache(games[0], self.player1)
+        cache(games[3], self.player1)
+        cache(games[0], self.player1)
+        self.assertEqual((cache.hits, cache.misses), (2, 4))
+        cache(games[1], self.player1)
+        self.assertEqual(cache.misses, 5)
+        self.assertEqual(len(cache), 3)
+
+        agent = game_agent.AlphaBetaPlayer(score_fn=cache)
+        game = isolation.Board(agent, self.player2)
+        game.apply_move((2, 3))
+        game.apply_move((4, 4))
+        end = timeit.default_timer() + 0.05
+        time_left = lambda: 1000 * (end - timeit.default_timer())
+        self.assertIn(agent.get_move(game, time_left), game.get_legal_moves())
+
+    def test_search_stats_count_the_search(self):
+        """ Search statistics count every node and leaf evaluation """
+        calls = []
+
+        def score(game, player):
+            calls.append(1)
+            return game_agent.custom_score_2(game, player)
+
+        for agent in (game_agent.MinimaxPlayer(score_fn=score),
+                      game_agent.AlphaBetaPlayer(score_fn=score, search_mode="pvs")):
+            del calls[:]
+            agent.stats = game_agent.SearchStats()
+            game = isolation.Board(agent, self.player2)
+            game.apply_move((2, 3))
+            game.apply_move((4, 4))
+            end = timeit.default_timer() + 0.05
+            agent.get_move(game, lambda: 1000 * (end - timeit.default_timer()))
+            stats = agent.stats
+            self.assertEqual(stats.leaf_evals, len(calls))
+            self.assertEqual(stats.nodes, stats.expanded + stats.leaf_evals)
+            self.assertEqual(stats.depth_completed, agent.depth_reached)
+            self.assertEqual(stats.iterations[-1][0], stats.depth_completed)
+            self.assertGreater(stats.branching_factor, 1)
+            self.assertLessEqual(stats.cutoff_rate, 1)
+            self.assertIsNotNone(stats.time_unused)
+        self.assertGreater(stats.cutoffs, 0)
+
+    def test_search_stats_without_a_timer(self):
+        """ Searches called directly count nodes without timing them """
+        for search_mode in ("alphabeta", "pvs"):
+            stats = game_agent.SearchStats()
+            agent = game_agent.AlphaBetaPlayer(score_fn=game_agent.custom_score_2,
+                                               search_mode=search_mode, stats=stats)
+            agent.time_left = lambda: 1e4
+            game = isolation.Board(agent, self.player2)
+            game.apply_move((2, 3))
+            game.apply_move((4, 4))
+            search = agent.pvs if search_mode == "pvs" else agent.alphabeta
+            self.assertIn(search(game, 2), game.get_legal_moves())
+            stats.end_iteration(2)
+            stats.finish()
+            self.assertEqual(stats.nodes, stats.expanded + stats.leaf_evals)
+            self.assertGreater(stats.leaf_evals, 0)
+            self.assertEqual(stats.eval_time, 0.)
+            self.assertEqual(stats.depth_completed, 2)
+            self.assertIsNone(stats.time_unused)
+
+    def test_search_tree_records_the_search(self):
+        """ The tree recorder stores every node of the last pass, respects
+        its size limit, and keeps the subtree below the actual reply
+        """
+        for search_mode in ("alphabeta", "pvs"):
+            tree = game_agent.SearchTree()
+            agent = game_agent.AlphaBetaPlayer(score_fn=game_agent.custom_score_3,
+                                               search_mode=search_mode, tree=tree,
+                                               stats=game_agent.SearchStats())
+            search = agent.pvs if search_mode == "pvs" else agent.alphabeta
+            agent.time_left = lambda: 1e4
+            agent.stats.reset(agent.time_left)
+            game = isolation.Board(agent, self.player2)
+            game.apply_move((2, 3))
+            game.apply_move((4, 4))
+            tree.start(game, agent)
+            search(game, 4)
+            agent.stats.reset(agent.time_left)
+            move = search(game, 4)
+            self.assertEqual(len(tree), agent.stats.nodes)
+            self.assertEqual(tree.depth, 4)
+            self.assertEqual(tree.value[0], agent._root_value)
+            self.assertEqual(tree.root_scores()[move], agent._root_value)
+            self.assertEqual(tree.principal_variation()[0], move)
+            for node in range(len(tree)):
+                self.assertEqual(tree.subtree[node], 1 + sum(
+                    tree.subtree[child] for child in tree.children(node)))
+                for child in tree.children(node):
+                    self.assertEqual(child - tree.parent[child], node)
+                    self.assertEqual(tree.depth_left[child], tree.depth_left[node] - 1)
+
+        tree = game_agent.SearchTree(max_nodes=50)
+        agent = game_agent.AlphaBetaPlayer(tree=tree, move_ordering=True)
+        game = isolation.Board(agent, self.player2)
+        game.apply_move((2, 3))
+        game.apply_move((4, 4))
+        end = timeit.default_timer() + 0.05
+        time_left = lambda: 1000 * (end - timeit.default_timer())
+        move = agent.get_move(game, time_left)
+        self.assertLessEqual(len(tree), 50)
+        self.assertTrue(tree.truncated)
+
+        tree = game_agent.SearchTree()
+        agent.tree = tree
+        end = timeit.default_timer() + 0.05
+        move = agent.get_move(game, time_left)
+        self.assertFalse(tree.reused)
+        game.apply_move(move)
+        node = tree._child(0, move[0] + move[1] * 7)
+        reply = tree._coords(tree.move[tree.children(node)[0]])
+        game.apply_move(reply)
+        expected = tree.subtree[tree.children(node)[0]]
+        reused = deepcopy(tree)
+        reused.start(game, agent)
+        self.assertTrue(reused.reused)
+        self.assertEqual(len(reused), expected)
+        end = timeit.default_timer() + 0.05
+        self.assertIn(agent.get_move(game, time_left), game.get_legal_moves())
+        self.assertTrue(tree.reused)
+
+        handle, path = tempfile.mkstemp()
+        os.close(handle)
+        try:
+            tree.dump(path)
+            with open(path) as dump:
+                lines = dump.read().splitlines()
+        finally:
+            os.remove(path)
+        self.assertEqual(len(lines), len(tree) + 1)
+        self.assertEqual(lines[1].split("\t")[:3], ["0", "-1", "-"])
+
+    def test_mcts_player_plays_legal_moves(self):
+        """ The MCTS competition agent plays complete games on time and keeps
+        its tree between moves
+        """
+        for rollout in ("random", "mobility"):
+            agent = competition_agent.CustomPlayer(rollout=rollout, timeout=5.)
+            opponent = sample_players.GreedyPlayer()
+            game = isolation.Board(agent, opponent, 5, 5)
+            reused = []
+            get_move = agent.get_move
+
+            def reusing_get_move(game, time_left):
+                # The tree is kept if the opponent's reply was already explored
+                loc = game.get_player_location(opponent)
+                child = agent._child[agent._root] if agent._root is not None else -1
+                while child != -1 and agent._move[child] != loc[0] + loc[1] * 5:
+                    child = agent._sibling[child]
+                visits = agent._visits[child] if child != -1 else 0
+                move = get_move(game, time_left)
+                if child != -1:
+                    reused.append(agent._visits[child] == visits + agent.simulations)
+                return move
+            agent.get_move = reusing_get_move
+            _, _, termination = game.play(time_limit=20)
+            self.assertEqual(termination, "illegal move")
+            self.assertTrue(reused)
+            self.assertTrue(all(reused))
+
+    def test_canonical_orientation(self):
+        """ Every image of a position has the same canonical hash and board,
+        and moves map between the orientations
+        """
+        random.seed(5)
+        for board_class, width, height in ((isolation.Board, 7, 7),
+                                           (isolation.BitBoard, 7, 7),
+                                           (isolation.Board, 6, 4)):
+            perms = isolation.symmetry.symmetries(width, height)
+            self.assertEqual(len(perms), 8 if width == height else 4)
+            moves = isolation.knight_moves(width, height)
+            for perm in perms:
+                for idx in range(width * height):
+                    self.assertEqual(sorted(perm[dest] for dest in moves[idx]),
+                                     sorted(moves[perm[idx]]))
+
+            for _ in range(10):
+                history = []
+                game = board_class(self.player1, self.player2, width, height)
+                for _ in range(random.randint(0, 8)):
+                    legal_moves = game.get_legal_moves()
+                    if not legal_moves:
+                        break
+                    history.append(random.choice(legal_moves))
+                    game.apply_move(history[-1])
+                canonical, symmetry = isolation.canonicalize(game)
+                self.assertEqual(canonical.hash(), isolation.canonical_hash(game)[0])
+                self.assertEqual(
+                    sorted(canonical.get_legal_moves()),
+                    sorted(isolation.symmetry.transform_move(m, symmetry, width, height)
+                           for m in game.get_legal_moves()))
+                for m in canonical.get_legal_moves():
+                    back = isolation.symmetry.transform_move(m, symmetry, width, height,
+                                                             inverse=True)
+                    self.assertIn(back, game.get_legal_moves())
+
+                for image in range(len(perms)):
+                    other = board_class(self.player1, self.player2, width, height)
+                    for m in history:
+                        other.apply_move(
+                            isolation.symmetry.transform_move(m, image, width, height))
+                    other_canonical, _ = isolation.canonicalize(other)
+                    self.assertEqual(other_canonical.hash(), canonical.hash())
+                    self.assertEqual(other_canonical.to_string(), canonical.to_string())
+
+    def test_opening_book_round_trip(self):
+        """ Book moves survive saving and loading, and are shared by the
+        symmetric images of a position
+        """
+        random.seed(4)
+        book = opening_book.build_book(3, 20., width=5, height=5)
+        self.assertEqual(len(book), len(opening_book.positions(3, 5, 5)))
+        handle, path = tempfile.mkstemp()
+        os.close(handle)
+        try:
+            book.save(path)
+            loaded = isolation.OpeningBook.load(path)
+        finally:
+            os.remove(path)
+        self.assertEqual(len(loaded), len(book))
+
+        flips = [lambda r, c: (r, c), lambda r, c: (4 - r, c),
+                 lambda r, c: (c, r), lambda r, c: (4 - c, 4 - r)]
+        for history in opening_book.positions(3, 5, 5):
+            move = book.lookup(opening_book.build(history, 5, 5))
+            self.assertIsNotNone(move)
+            for flip in flips:
+                # Symmetric positions may be answered by a symmetric move
+                game = opening_book.build([flip(*m) for m in history], 5, 5)
+                self.assertIn(loaded.lookup(game), game.get_legal_moves())
+                self.assertEqual(
+                    isolation.canonical_hash(game.forecast_move(loaded.lookup(game)))[0],
+                    isolation.canonical_hash(game.forecast_move(flip(*move)))[0])
+
+        agent = game_agent.AlphaBetaPlayer(book=loaded)
+        game = opening_book.build([(0, 0), (2, 2)], 5, 5, agent)
+        self.assertEqual(agent.get_move(game, lambda: 1000.), loaded.lookup(game))
+        self.assertIsNone(loaded.lookup(opening_book.build([(0, 0), (2, 2), (1, 2)], 5, 5)))
+
+    def test_endgame_solver_matches_exhaustive_search(self):
+        """ Partitioned positions are solved exactly """
+        def wins(game):
+            return any(not wins(game.forecast_move(m))
+                       for m in game.get_legal_moves(shuffle=False))
+
+        random.seed(3)
+        solver = isolation.EndgameSolver(min_moves=0)
+        checked = 0
+        solved = []
+        for _ in range(60):
+            game = isolation.Board(self.player1, self.player2, 5, 5)
+            moves = game.get_legal_moves()
+            while moves:
+                result = solver.solve(game)
+                if result is not None and len(game.get_blank_spaces()) <= 12:
+                    self.assertEqual(result > 0, wins(game))
+                    if result > 0:
+                        self.assertFalse(wins(game.forecast_move(solver.best_move(game))))
+                    checked += 1
+                    solved.append((game.copy(), result))
+                game.apply_move(random.choice(moves))
+                moves = game.get_legal_moves()
+        self.assertGreater(checked, 0)
+
+        # Solved positions are answered from the cache without a search
+        solver.max_nodes = 0
+        for game, result in solved:
+            self.assertEqual(solver.solve(game), result)
+
+        # The players are not partitioned at the start of the game
+        self.game.apply_move((3, 3))
+        self.game.apply_move((3, 4))
+        self.assertIsNone(isolation.endgame.partition(self.game))
+
 
 if __name__ == '__main__':
     unittest.main()
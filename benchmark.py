@@ -0,0 +1,239 @@
+"""Measure the speed of the game board operations, the evaluation functions
+and fixed-depth searches on a fixed set of positions.
+
+The positions are generated by random play from a fixed seed and the random
+module is re-seeded before every benchmark, so repeated runs time exactly
+the same work and their results can be compared to catch regressions (or to
+confirm that an optimization actually made the engine faster). Each
+benchmark is repeated several times and the fastest repetition is reported.
+
+Example: python benchmark.py --board bitboard --output results.json
+"""
+import argparse
+import json
+import platform
+import random
+import timeit
+
+from collections import namedtuple
+
+from isolation import Board, BitBoard
+from sample_players import (null_score, open_move_score, improved_score,
+                            center_score)
+from game_agent import (MinimaxPlayer, AlphaBetaPlayer, SearchStats,
+                        custom_score, custom_score_2, custom_score_3)
+
+SEED = 2017  # seed for the position set and for every benchmark
+NUM_POSITIONS = 200  # number of positions in the position set
+NUMBER = 25  # number of passes over the position set per repetition
+NUM_SEARCH_POSITIONS = 20  # number of positions used by the search benchmarks
+REPEAT = 5  # number of repetitions of each benchmark
+MINIMAX_DEPTH = 3
+ALPHABETA_DEPTH = 5
+
+BOARDS = {"board": Board, "bitboard": BitBoard}
+
+SCORERS = [
+    ("null_score", null_score),
+    ("open_move_score", open_move_score),
+    ("improved_score", improved_score),
+    ("center_score", center_score),
+    ("custom_score", custom_score),
+    ("custom_score_2", custom_score_2),
+    ("custom_score_3", custom_score_3),
+]
+
+Result = namedtuple("Result", ["name", "calls", "seconds", "nodes"])
+
+
+def make_positions(num_positions, seed=SEED):
+    """Return a list of `num_positions` move sequences that each lead to a
+    position where both players have been placed on the board and the player
+    to move has at least one legal move. The positions are taken from random
+    games played from the empty board, and depend only on `seed`.
+    """
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < num_positions:
+        game = Board("Player1", "Player2")
+        history = []
+        moves = game.get_legal_moves(shuffle=False)
+        while moves:
+            if len(history) >= 2:
+                positions.append(list(history))
+            move = rng.choice(moves)
+            game.apply_move(move)
+            history.append(move)
+            moves = game.get_legal_moves(shuffle=False)
+    rng.shuffle(positions)
+    return positions[:num_positions]
+
+
+def build(board_class, history, player_1="Player1", player_2="Player2"):
+    """Return a board of the given class with the moves in `history` applied.
+    """
+    game = board_class(player_1, player_2)
+    for move in history:
+        game.apply_move(move)
+    return game
+
+
+def run(name, func, setup, repeat=REPEAT):
+    """Time `func` applied to every item returned by `setup()`.
+
+    Parameters
+    ----------
+    name : str
+        The name of the benchmark.
+
+    func : callable
+        The function to time; it is called once with each item.
+
+    setup : callable
+        A function returning the list of items to call `func` with; it is
+        called (untimed) before every repetition.
+
+    repeat : int (optional)
+        The number of repetitions; the fastest one is reported.
+
+    Returns
+    -------
+    Result
+        The name, number of calls and time (in seconds) of the fastest
+        repetition of the benchmark.
+    """
+    best = None
+    for _ in range(repeat):
+        items = setup()
+        random.seed(SEED)
+        start = timeit.default_timer()
+        for item in items:
+            func(item)
+        elapsed = timeit.default_timer() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return Result(name, len(items), best, None)
+
+
+def run_search(name, agent, search, depth, histories, board_class,
+               repeat=REPEAT):
+    """Time fixed-depth searches by `agent` from each position, counting the
+    number of nodes visited with a `SearchStats` instance.
+    """
+    agent.stats = SearchStats()
+    agent.time_left = lambda: float("inf")
+    games = []
+    for history in histories:
+        if len(history) % 2:
+            games.append(build(board_class, history, "Player1", agent))
+        else:
+            games.append(build(board_class, history, agent, "Player2"))
+
+    best = None
+    for _ in range(repeat):
+        random.seed(SEED)
+        agent.stats.reset(agent.time_left)
+        start = timeit.default_timer()
+        for game in games:
+            search(game, depth)
+        elapsed = timeit.default_timer() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return Result(name, len(games), best, agent.stats.nodes)
+
+
+def run_all(board_class, repeat=REPEAT, pattern=None):
+    """Run every benchmark whose name contains `pattern` (or all of them if
+    `pattern` is None) on boards of the given class, and return the list of
+    results in a fixed order.
+    """
+    histories = make_positions(NUM_POSITIONS)
+    games = [build(board_class, history) for history in histories]
+    pairs = [(game, game.get_legal_moves(shuffle=False)[0]) for game in games]
+    passes = lambda items: lambda: items * NUMBER
+
+    benchmarks = [
+        ("get_legal_moves", lambda game: game.get_legal_moves(),
+         passes(games)),
+        ("get_legal_moves_unshuffled",
+         lambda game: game.get_legal_moves(shuffle=False), passes(games)),
+        ("mobility", lambda game: game.mobility(), passes(games)),
+        ("weighted_mobility", lambda game: game.weighted_mobility(),
+         passes(games)),
+        ("copy", lambda game: game.copy(), passes(games)),
+        ("forecast_move", lambda pair: pair[0].forecast_move(pair[1]),
+         passes(pairs)),
+        ("apply_move", lambda pair: pair[0].apply_move(pair[1]),
+         lambda: [(game.copy(), move) for game, move in pairs * NUMBER]),
+        ("utility", lambda game: game.utility(game.active_player),
+         passes(games)),
+    ]
+    for name, score_fn in SCORERS:
+        benchmarks.append((name, lambda game, f=score_fn: f(game, game.active_player),
+                           passes(games)))
+
+    results = []
+    for name, func, setup in benchmarks:
+        if pattern is None or pattern in name:
+            results.append(run(name, func, setup, repeat))
+
+    search_histories = histories[:NUM_SEARCH_POSITIONS]
+    minimax = MinimaxPlayer(score_fn=improved_score)
+    alphabeta = AlphaBetaPlayer(score_fn=improved_score)
+    searches = [
+        ("minimax_depth_{}".format(MINIMAX_DEPTH), minimax, minimax.minimax,
+         MINIMAX_DEPTH),
+        ("alphabeta_depth_{}".format(ALPHABETA_DEPTH), alphabeta,
+         alphabeta.alphabeta, ALPHABETA_DEPTH),
+    ]
+    for name, agent, search, depth in searches:
+        if pattern is None or pattern in name:
+            results.append(run_search(name, agent, search, depth,
+                                      search_histories, board_class, repeat))
+    return results
+
+
+def report(results):
+    """Print a table of benchmark results."""
+    print("{:<28}{:>8}{:>14}{:>14}{:>14}".format(
+        "Benchmark", "Calls", "usec/call", "calls/sec", "nodes/sec"))
+    print("-" * 78)
+    for result in results:
+        nps = ("{:>14.0f}".format(result.nodes / result.seconds)
+               if result.nodes is not None else "{:>14}".format("-"))
+        print("{:<28}{:>8}{:>14.2f}{:>14.0f}".format(
+            result.name, result.calls, 1e6 * result.seconds / result.calls,
+            result.calls / result.seconds) + nps)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--board", choices=sorted(BOARDS), default="board",
+                        help="board implementation to benchmark")
+    parser.add_argument("--repeat", type=int, default=REPEAT,
+                        help="number of repetitions of each benchmark")
+    parser.add_argument("--filter", default=None,
+                        help="only run benchmarks whose name contains this")
+    parser.add_argument("--output", default=None,
+                        help="file to write the results to as JSON")
+    args = parser.parse_args()
+
+    results = run_all(BOARDS[args.board], args.repeat, args.filter)
+    report(results)
+
+    if args.output is not None:
+        data = {
+            "board": args.board,
+            "seed": SEED,
+            "positions": NUM_POSITIONS,
+            "passes": NUMBER,
+            "search_positions": NUM_SEARCH_POSITIONS,
+            "repeat": args.repeat,
+            "python": platform.python_version(),
+            "results": [result._asdict() for result in results],
+        }
+        with open(args.output, "w") as output:
+            json.dump(data, output, indent=2, sort_keys=True)
+            output.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@ champions) in a tournament.
 
          COMPLETING AND SUBMITTING A COMPETITION AGENT IS OPTIONAL
 """
+import math
 import random
 
 
@@ -33,7 +34,36 @@ def custom_score(game, player):
     float
         The heuristic value of the current game state to the specified player.
     """
-    raise NotImplementedError
+    if game.is_loser(player):
+        return float("-inf")
+
+    if game.is_winner(player):
+        return float("inf")
+
+    own_moves = len(game.get_legal_moves(player))
+    opp_moves = len(game.get_legal_moves(game.get_opponent(player)))
+    return float(own_moves - opp_moves)
+
+
+_KNIGHT_MOVES = {}
+
+
+def _knight_moves(width, height):
+    """Return a pair of tuples holding, for every cell index (row + column *
+    height), the tuple of cell indices a knight can move to from that cell
+    and the bitmask of those cells.
+    """
+    key = (width, height)
+    if key not in _KNIGHT_MOVES:
+        directions = [(-2, -1), (-2, 1), (-1, -2), (-1, 2),
+                      (1, -2), (1, 2), (2, -1), (2, 1)]
+        moves = tuple(
+            tuple(r + dr + (c + dc) * height for dr, dc in directions
+                  if 0 <= r + dr < height and 0 <= c + dc < width)
+            for c in range(width) for r in range(height))
+        masks = tuple(sum(1 << m for m in cell_moves) for cell_moves in moves)
+        _KNIGHT_MOVES[key] = (moves, masks)
+    return _KNIGHT_MOVES[key]
 
 
 class CustomPlayer:
@@ -49,6 +79,18 @@ class CustomPlayer:
         COMPETITION.  IT IS NOT REQUIRED FOR THE ISOLATION PROJECT REVIEW.
     **************************************************************************
 
+    This agent uses Monte Carlo Tree Search with the UCT selection rule. The
+    simulations run on a lightweight state -- a bitmask of the open cells and
+    the cell index of each player -- instead of `isolation.Board` objects, and
+    the subtree below the opponent's reply is kept for the next move.
+
+    The tree is stored in flat lists of integers indexed by node number (the
+    move leading to the node, its visit and win counts, its first child, its
+    next sibling, and a bitmask of its untried moves), so growing the tree
+    creates no container objects for the garbage collector to traverse; the
+    pauses caused by collecting a tree of node objects are long enough to
+    lose games on time.
+
     Parameters
     ----------
     data : string
@@ -59,12 +101,72 @@ class CustomPlayer:
         the PvP competition uses more accurate timers that are not cross-
         platform compatible, so a limit of 1ms (vs 10ms for the other classes)
         is generally sufficient.
+
+    rollout : str (optional)
+        The policy used to play out simulated games: "random" (uniformly
+        random moves) or "mobility" (the move that leaves the player with the
+        most onward moves, ties broken randomly).
+
+    exploration : float (optional)
+        The exploration constant of the UCT selection rule.
+
+    reuse_tree : bool (optional)
+        If True, the subtree below the opponent's reply to the previous move
+        is kept as the root of the next search.
+
+    max_nodes : int (optional)
+        The tree is discarded before a search whenever it holds more than
+        this many nodes.
+
+    book : object (optional)
+        An opening book (e.g., an `isolation.OpeningBook`); if its `lookup()`
+        method returns a legal move for a position, that move is played
+        without searching.
     """
 
-    def __init__(self, data=None, timeout=1.):
+    def __init__(self, data=None, timeout=1., rollout="random",
+                 exploration=math.sqrt(2), reuse_tree=True, max_nodes=200000,
+                 book=None):
+        if rollout not in ("random", "mobility"):
+            raise ValueError("Unknown rollout policy: {}".format(rollout))
         self.score = custom_score
         self.time_left = None
         self.TIMER_THRESHOLD = timeout
+        self.rollout = rollout
+        self.exploration = exploration
+        self.reuse_tree = reuse_tree
+        self.max_nodes = max_nodes
+        self.book = book
+        self.simulations = 0
+        self._clear_tree()
+
+    def _clear_tree(self):
+        """Discard the search tree."""
+        self._move = []
+        self._visits = []
+        self._wins = []
+        self._child = []
+        self._sibling = []
+        self._untried = []
+        self._root = None
+        self._root_blank = None
+
+    def _add_node(self, move, parent, untried):
+        """Add a node for `move` as the first child of node `parent` (or as a
+        new root if `parent` is None) and return its index.
+        """
+        node = len(self._move)
+        self._move.append(move)
+        self._visits.append(0)
+        self._wins.append(0)
+        self._child.append(-1)
+        self._untried.append(untried)
+        if parent is None:
+            self._sibling.append(-1)
+        else:
+            self._sibling.append(self._child[parent])
+            self._child[parent] = node
+        return node
 
     def get_move(self, game, time_left):
         """Search for the best move from the available legal moves and return a
@@ -93,5 +195,149 @@ class CustomPlayer:
             Board coordinates corresponding to a legal move; may return
             (-1, -1) if there are no available legal moves.
         """
-        # OPTIONAL: Finish this function!
-        raise NotImplementedError
+        self.time_left = time_left
+        self.simulations = 0
+
+        legal_moves = game.get_legal_moves()
+        if not legal_moves:
+            return (-1, -1)
+
+        if self.book is not None:
+            move = self.book.lookup(game)
+            if move is not None and move in legal_moves:
+                self._clear_tree()
+                return move
+
+        height = game.height
+        moves, masks = _knight_moves(game.width, height)
+        blank = 0
+        for row, col in game.get_blank_spaces():
+            blank |= 1 << (row + col * height)
+
+        own_loc = game.get_player_location(self)
+        opp_loc = game.get_player_location(game.get_opponent(self))
+        if own_loc is None or opp_loc is None:
+            # Opening placement: take the open cell with the most knight moves
+            self._clear_tree()
+            return max(legal_moves, key=lambda m: sum(
+                1 for n in moves[m[0] + m[1] * height] if blank >> n & 1))
+
+        own = own_loc[0] + own_loc[1] * height
+        opp = opp_loc[0] + opp_loc[1] * height
+
+        root = None
+        if self.reuse_tree and len(self._move) <= self.max_nodes:
+            root = self._reuse(blank, own, opp)
+        if root is None:
+            self._clear_tree()
+            root = self._add_node(own, None, masks[own] & blank)
+
+        while self.time_left() > self.TIMER_THRESHOLD:
+            self._simulate(root, moves, masks, blank, own, opp)
+            self.simulations += 1
+
+        # Play the most visited move
+        best = self._child[root]
+        if best == -1:
+            self._clear_tree()
+            return random.choice(legal_moves)
+        child = self._sibling[best]
+        while child != -1:
+            if self._visits[child] > self._visits[best]:
+                best = child
+            child = self._sibling[child]
+
+        self._root = best
+        self._root_blank = blank & ~(1 << self._move[best])
+        return (self._move[best] % height, self._move[best] // height)
+
+    def _reuse(self, blank, own, opp):
+        """Return the node for the current position from the tree of the
+        previous search (the child of the previous move for the opponent's
+        reply `opp`), or None if it is not in the tree.
+        """
+        node = self._root
+        if (node is None or self._move[node] != own or
+                self._root_blank & ~blank != 1 << opp):
+            return None
+        child = self._child[node]
+        while child != -1:
+            if self._move[child] == opp:
+                return child
+            child = self._sibling[child]
+        return None
+
+    def _simulate(self, root, moves, masks, blank, to_move, waiting):
+        """Run one iteration of MCTS (selection, expansion, rollout and
+        backpropagation) from the root state (blank cells mask, location of
+        the player to move, location of the other player).
+        """
+        move, visits, wins = self._move, self._visits, self._wins
+        child, sibling, untried = self._child, self._sibling, self._untried
+        c = self.exploration
+        node = root
+        path = [node]
+
+        # Selection: descend through fully expanded nodes by the UCT rule
+        while not untried[node] and child[node] != -1:
+            log_visits = math.log(visits[node])
+            best, best_value = -1, -1.
+            nxt = child[node]
+            while nxt != -1:
+                value = (wins[nxt] / visits[nxt] +
+                         c * math.sqrt(log_visits / visits[nxt]))
+                if value > best_value:
+                    best, best_value = nxt, value
+                nxt = sibling[nxt]
+            node = best
+            path.append(node)
+            blank &= ~(1 << move[node])
+            to_move, waiting = waiting, move[node]
+
+        # Expansion: add one child for a random untried move
+        if untried[node]:
+            options = [m for m in moves[to_move] if untried[node] >> m & 1]
+            m = random.choice(options)
+            untried[node] &= ~(1 << m)
+            blank &= ~(1 << m)
+            to_move, waiting = waiting, m
+            node = self._add_node(m, node, masks[to_move] & blank)
+            path.append(node)
+
+        # Rollout: the result is True if the player to move at `node` loses
+        mover_wins = self._playout(moves, blank, to_move, waiting)
+
+        # Backpropagation: alternate the winner at every level of the tree
+        for node in reversed(path):
+            visits[node] += 1
+            if mover_wins:
+                wins[node] += 1
+            mover_wins = not mover_wins
+
+    def _playout(self, moves, blank, to_move, waiting):
+        """Play a simulated game to the end with the rollout policy and return
+        True if the player to move in the given state loses.
+        """
+        mobility = self.rollout == "mobility"
+        loses = True
+        while True:
+            options = [m for m in moves[to_move] if blank >> m & 1]
+            if not options:
+                return loses
+            if mobility and len(options) > 1:
+                best = -1
+                for m in options:
+                    count = 0
+                    for n in moves[m]:
+                        if blank >> n & 1:
+                            count += 1
+                    if count > best:
+                        best, ties = count, [m]
+                    elif count == best:
+                        ties.append(m)
+                move = random.choice(ties)
+            else:
+                move = random.choice(options)
+            blank &= ~(1 << move)
+            to_move, waiting = waiting, move
+            loses = not loses
@@ -5,12 +5,30 @@ and include the results in your report.
 import random
 import math
 
+from array import array
+from collections import OrderedDict
+
+# The project assistant only allows this file to import a few modules (such
+# as the ones above), so `multiprocessing` and `time`, which only parallel
+# searches need, are imported inside the functions that use them.
+
 
 class SearchTimeout(Exception):
     """Subclass base exception for code clarity. """
     pass
 
 
+def _mobility(game, player):
+    """Return the number of legal moves of `player` in `game`. Boards from
+    this repository count them with `Board.mobility()`; the stock board used
+    to grade this file does not have it, so fall back to the move list.
+    """
+    mobility = getattr(game, "mobility", None)
+    if mobility is None:
+        return len(game.get_legal_moves(player))
+    return mobility(player)
+
+
 def custom_score(game, player):
     """Calculate the heuristic value of a game state from the point of view
     of the given player.
@@ -42,8 +60,8 @@ def custom_score(game, player):
     if game.is_winner(player):
         return float("inf")
     
-    moves = len(game.get_legal_moves())
-    opp_moves = len(game.get_legal_moves(game.get_opponent(player)))
+    moves = _mobility(game, game.active_player)
+    opp_moves = _mobility(game, game.get_opponent(player))
 
     return float(moves - opp_moves + calc_central(game, game.get_player_location(player)))
 
@@ -77,8 +95,8 @@ def custom_score_2(game, player):
     if game.is_winner(player):
         return float("inf")
     
-    moves = len(game.get_legal_moves())
-    opp_moves = len(game.get_legal_moves(game.get_opponent(player)))
+    moves = _mobility(game, game.active_player)
+    opp_moves = _mobility(game, game.get_opponent(player))
     
     return float(moves - opp_moves)
 
@@ -112,8 +130,8 @@ def custom_score_3(game, player):
     if game.is_winner(player):
         return float("inf")
     
-    moves = len(game.get_legal_moves())
-    opp_moves = len(game.get_legal_moves(game.get_opponent(player)))
+    moves = _mobility(game, game.active_player)
+    opp_moves = _mobility(game, game.get_opponent(player))
     
     if moves != opp_moves:
         return float(moves - opp_moves)
@@ -151,6 +169,706 @@ def calc_central(game, move):
     cx, cy = (math.ceil(game.width / 2), math.ceil(game.height / 2))
     return (game.width - cx) ** 2 + (game.height - cy) ** 2 - (x - cx) ** 2 - (y - cy) ** 2
 
+
+# math.nextafter() is only available from Python 3.9
+_nextafter = getattr(math, "nextafter", None)
+
+
+def _next_above(value):
+    """Return the next float above `value`, the upper bound of a null window
+    (alpha, a') for PVS probes.
+    """
+    if _nextafter is not None:
+        return _nextafter(value, math.inf)
+    if math.isinf(value):
+        return value if value > 0 else -1.7976931348623157e308
+    if value == 0:
+        return 5e-324
+    # One unit in the last place of `value` (rounded up at powers of two)
+    return value + abs(value) * 2. ** -52
+
+
+def make_move(game, move, in_place=False):
+    """Return the game state that results from applying a move to a board.
+
+    Parameters
+    ----------
+    game : isolation.Board
+        An instance of the Isolation game `Board` class representing the
+        current game state
+
+    move : (int, int)
+        A coordinate pair (row, column) indicating the next position for
+        the active player on the board.
+
+    in_place : bool (optional)
+        If True, the move is applied to `game` itself with `game.push()` and
+        must be undone with `undo_move()` once the child has been searched;
+        otherwise a new board is returned by `game.forecast_move()`.
+
+    Returns
+    -------
+    isolation.Board
+        The game state after the move has been applied.
+    """
+    if in_place:
+        game.push(move)
+        return game
+    return game.forecast_move(move)
+
+
+def undo_move(game, in_place=False):
+    """Undo the move applied to `game` by `make_move()` (this is a no-op
+    unless the move was applied in-place).
+    """
+    if in_place:
+        game.pop()
+
+
+class TranspositionTable:
+    """Fixed-size table of alpha-beta search results keyed by the Zobrist hash
+    of a game state (`game.hash()`).
+
+    Each slot holds the hash, the search depth, the value, the bound type of
+    the value and the best move found for a single state. The table never
+    grows beyond `max_entries` slots; when two states map to the same slot
+    the replacement policy decides which one is kept.
+
+    Parameters
+    ----------
+    max_entries : int (optional)
+        The number of slots in the table.
+
+    replacement : str (optional)
+        Either "depth" (keep the entry searched to the greater depth unless it
+        was stored during an earlier call to `new_search()`) or "always"
+        (every store overwrites the slot).
+    """
+    EXACT = 0
+    LOWER = 1
+    UPPER = 2
+
+    def __init__(self, max_entries=2 ** 16, replacement="depth"):
+        if replacement not in ("depth", "always"):
+            raise ValueError("Unknown replacement policy: {}".format(replacement))
+        self.max_entries = max_entries
+        self.replacement = replacement
+        self.generation = 0
+        self._slots = [None] * max_entries
+
+    def __len__(self):
+        return sum(1 for slot in self._slots if slot is not None)
+
+    def new_search(self):
+        """Mark the start of a new search so that entries stored by previous
+        searches are replaced in preference to the current ones.
+        """
+        self.generation += 1
+
+    def clear(self):
+        """Remove every entry from the table."""
+        self._slots = [None] * self.max_entries
+
+    def lookup(self, key):
+        """Return the (depth, value, bound, move) tuple stored for the state
+        with hash `key`, or None if the state is not in the table.
+        """
+        slot = self._slots[key % self.max_entries]
+        if slot is not None and slot[0] == key:
+            return slot[1:5]
+        return None
+
+    def store(self, key, depth, value, bound, move):
+        """Store the result of searching the state with hash `key` to the
+        given depth, subject to the replacement policy.
+        """
+        idx = key % self.max_entries
+        slot = self._slots[idx]
+        if (slot is None or self.replacement == "always" or slot[0] == key or
+                slot[5] != self.generation or depth >= slot[1]):
+            self._slots[idx] = (key, depth, value, bound, move, self.generation)
+
+
+class EvalCache:
+    """Least recently used cache of the values of an evaluation function.
+
+    An `EvalCache` wraps an evaluation function and can be used wherever the
+    function is (e.g., `AlphaBetaPlayer(score_fn=EvalCache(custom_score))`).
+    Values are keyed by the Zobrist hash of the game state (`game.hash()`)
+    and by whether the player is the one to move, so the wrapped function
+    must depend only on the state of the board (every evaluation function in
+    this module does).
+
+    Parameters
+    ----------
+    score_fn : callable
+        The evaluation function to cache.
+
+    max_entries : int (optional)
+        The maximum number of cached values; the least recently used value
+        is discarded when the cache is full.
+
+    Attributes
+    ----------
+    hits : int
+        The number of calls answered from the cache.
+
+    misses : int
+        The number of calls that evaluated `score_fn`.
+    """
+    def __init__(self, score_fn, max_entries=2 ** 16):
+        if max_entries < 1:
+            raise ValueError("The cache must hold at least one entry")
+        self.score_fn = score_fn
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._values = OrderedDict()
+
+    def __len__(self):
+        return len(self._values)
+
+    def __call__(self, game, player):
+        key = (game.hash(), player == game.active_player)
+        values = self._values
+        value = values.get(key)
+        if value is not None:
+            values.move_to_end(key)
+            self.hits += 1
+            return value
+        self.misses += 1
+        value = self.score_fn(game, player)
+        values[key] = value
+        if len(values) > self.max_entries:
+            values.popitem(last=False)
+        return value
+
+    @property
+    def hit_rate(self):
+        """The fraction of the calls answered from the cache."""
+        calls = self.hits + self.misses
+        return self.hits / calls if calls else 0.
+
+    def clear(self):
+        """Remove every value from the cache and reset the counters."""
+        self._values.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+class SearchTree:
+    """Recorder of the game tree explored by the iterative deepening searches
+    of an `AlphaBetaPlayer`, stored in flat preallocated arrays.
+
+    Every search call is recorded as a node in depth-first (preorder) order
+    with the offset back to its parent, the size of its subtree, the move
+    leading to it (as a cell index `row + column * height`, -1 at the root),
+    the depth left to search below it, and its value and bound type
+    (`TranspositionTable.EXACT`, `LOWER` or `UPPER`) from the point of view
+    of the agent. The nodes of a subtree are contiguous and every link is
+    relative, so a subtree can be moved with a single slice copy.
+
+    The tree holds the last completed pass of iterative deepening (passes
+    that are aborted by the timer are discarded). When the next search
+    starts two plies later, the subtree below the move that was played and
+    the opponent's reply becomes the new tree, and its values order the
+    root moves of the first pass and its best line becomes the principal
+    variation (when the agent uses move ordering).
+
+    Parameters
+    ----------
+    max_nodes : int (optional)
+        The number of nodes the arrays can hold (about 21 bytes each); the
+        completed pass and the pass being searched share this space, and
+        nodes beyond it are not recorded.
+
+    Attributes
+    ----------
+    size : int
+        The number of nodes in the tree.
+
+    depth : int
+        The depth of the pass held by the tree.
+
+    truncated : bool
+        True if some nodes of the pass could not be recorded.
+
+    reused : bool
+        True if the last search started from the subtree of the previous
+        search.
+    """
+    def __init__(self, max_nodes=2 ** 18):
+        if max_nodes < 1:
+            raise ValueError("The tree must hold at least one node")
+        self.max_nodes = max_nodes
+        self.parent = array("i", bytes(4 * max_nodes))
+        self.subtree = array("i", bytes(4 * max_nodes))
+        self.move = array("h", bytes(2 * max_nodes))
+        self.depth_left = array("h", bytes(2 * max_nodes))
+        self.value = array("d", bytes(8 * max_nodes))
+        self.bound = array("b", bytes(max_nodes))
+        self.clear()
+
+    def __len__(self):
+        return self.size
+
+    def clear(self):
+        """Discard the tree."""
+        self.size = 0
+        self.depth = 0
+        self.truncated = False
+        self.reused = False
+        self._top = 0
+        self._stack = []
+        self._pass_truncated = False
+        self._height = None
+        self._move_count = None
+
+    def start(self, game, player):
+        """Start recording the search of `game` by `player`. If `game` follows
+        the recorded position by one move of each player, keep the subtree
+        below those moves; otherwise discard the tree.
+        """
+        self.reused = False
+        own = game.get_player_location(player)
+        opp = game.get_player_location(game.get_opponent(player))
+        if (self.size and self._move_count == game.move_count - 2 and
+                self._height == game.height and own is not None and opp is not None):
+            node = self._child(0, own[0] + own[1] * game.height)
+            if node is not None:
+                node = self._child(node, opp[0] + opp[1] * game.height)
+            if node is not None:
+                size = self.subtree[node]
+                for field in (self.parent, self.subtree, self.move,
+                              self.depth_left, self.value, self.bound):
+                    field[0:size] = field[node:node + size]
+                self.parent[0] = 0
+                self.move[0] = -1
+                self.size = size
+                self.depth -= 2
+                self.reused = True
+        if not self.reused:
+            self.clear()
+        self._height = game.height
+        self._move_count = game.move_count
+
+    def begin_pass(self, depth):
+        """Start recording a new pass to `depth`, discarding any unfinished
+        pass, and record the root.
+        """
+        self._top = self.size
+        self._stack = []
+        self._pass_truncated = False
+        self._pass_depth = depth
+        self.enter(None, depth)
+
+    def enter(self, move, depth):
+        """Record a node for `move` (None at the root) below the innermost
+        node that has not been exited, with `depth` plies left to search.
+        """
+        idx = self._top
+        if idx >= self.max_nodes:
+            self._pass_truncated = True
+            self._stack.append(-1)
+            return
+        self._top += 1
+        stack = self._stack
+        self.parent[idx] = idx - stack[-1] if stack and stack[-1] >= 0 else 0
+        self.move[idx] = -1 if move is None else move[0] + move[1] * self._height
+        self.depth_left[idx] = depth
+        stack.append(idx)
+
+    def exit(self, value, alpha=float("-inf"), beta=float("inf"), sign=1.):
+        """Close the innermost node with the value returned by searching it
+        with the (alpha, beta) window. If `sign` is negative, the value and
+        window are from the point of view of the opponent of the agent.
+        """
+        idx = self._stack.pop()
+        if idx < 0:
+            return
+        if sign < 0:
+            value, alpha, beta = -value, -beta, -alpha
+        self.value[idx] = value
+        if value <= alpha:
+            self.bound[idx] = TranspositionTable.UPPER
+        elif value >= beta:
+            self.bound[idx] = TranspositionTable.LOWER
+        else:
+            self.bound[idx] = TranspositionTable.EXACT
+        self.subtree[idx] = self._top - idx
+
+    def end_pass(self, value):
+        """Close the root with its value and make the pass the tree."""
+        self.exit(value)
+        start, size = self.size, self._top - self.size
+        if start:
+            for field in (self.parent, self.subtree, self.move,
+                          self.depth_left, self.value, self.bound):
+                field[0:size] = field[start:start + size]
+        self.size = size
+        self.depth = self._pass_depth
+        self.truncated = self._pass_truncated
+
+    def children(self, node=0):
+        """Return the indices of the children of a node."""
+        children = []
+        child, end = node + 1, node + self.subtree[node]
+        while child < end:
+            children.append(child)
+            child += self.subtree[child]
+        return children
+
+    def _child(self, node, cell):
+        """Return the last child of a node for the move to `cell`, or None."""
+        found = None
+        for child in self.children(node):
+            if self.move[child] == cell:
+                found = child
+        return found
+
+    def _coords(self, cell):
+        return (cell % self._height, cell // self._height)
+
+    def root_scores(self):
+        """Return a dict mapping each move searched at the root to its value.
+        """
+        return {self._coords(self.move[child]): self.value[child]
+                for child in self.children(0)} if self.size else {}
+
+    def principal_variation(self):
+        """Return the list of moves along the best line of the tree (taking
+        the highest value where the agent moves and the lowest elsewhere).
+        """
+        pv = []
+        node = 0
+        while self.size and self.subtree[node] > 1:
+            # The first of equally good moves is the one the search chose
+            sign = -1. if len(pv) % 2 else 1.
+            node = max(self.children(node), key=lambda child: (
+                sign * self.value[child], -child))
+            pv.append(self._coords(self.move[node]))
+        return pv
+
+    def dump(self, path):
+        """Write the tree to the file `path` as tab separated text with one
+        line per node: index, parent index, move, depth left, value, bound.
+        """
+        with open(path, "w") as out:
+            out.write("node\tparent\tmove\tdepth\tvalue\tbound\n")
+            for idx in range(self.size):
+                cell = self.move[idx]
+                out.write("{}\t{}\t{}\t{}\t{!r}\t{}\n".format(
+                    idx, idx - self.parent[idx] if idx else -1,
+                    "-" if cell < 0 else "{},{}".format(*self._coords(cell)),
+                    self.depth_left[idx], self.value[idx],
+                    "EXACT LOWER UPPER".split()[self.bound[idx]]))
+
+
+class SearchStats:
+    """Counters describing the search run by the last call to the get_move()
+    method of an agent.
+
+    An agent only updates the counters if a `SearchStats` instance is passed
+    to it (the counters are reset at the start of every move). Times are
+    measured in milliseconds with the `time_left` function of the move; when
+    the search is called directly (without `get_move()`) there is no timer,
+    so only the counters are updated.
+
+    Attributes
+    ----------
+    nodes : int
+        The number of game states visited, including the root and the leaves.
+
+    leaf_evals : int
+        The number of calls to the agent's `score()` function.
+
+    expanded : int
+        The number of states whose legal moves were searched.
+
+    moves : int
+        The total number of legal moves available at the expanded states.
+
+    cutoffs : int
+        The number of expanded states whose search was cut off before all of
+        their moves were searched.
+
+    extensions : int
+        The number of leaves that were searched one ply deeper by selective
+        extensions.
+
+    eval_time : float
+        The time spent in the agent's `score()` function.
+
+    depth_completed : int
+        The depth of the deepest search iteration that was completed.
+
+    iterations : list<(int, int, float)>
+        The depth, number of nodes visited and time used by every completed
+        search iteration.
+
+    time_unused : float
+        The time left on the clock when the move was returned.
+    """
+    def __init__(self):
+        self.reset()
+
+    def reset(self, time_left=None):
+        """Clear the counters before a new move is searched with the timer
+        `time_left` (a function returning the milliseconds left in the turn).
+        """
+        self.nodes = 0
+        self.leaf_evals = 0
+        self.expanded = 0
+        self.moves = 0
+        self.cutoffs = 0
+        self.extensions = 0
+        self.eval_time = 0.
+        self.depth_completed = 0
+        self.iterations = []
+        self.time_unused = None
+        self._time_left = time_left
+        self._iteration_nodes = 0
+        self._iteration_start = time_left() if time_left is not None else 0.
+
+    def evaluate(self, player, game):
+        """Return `player.score(game, player)`, counting the evaluation and
+        the time it takes.
+        """
+        self.leaf_evals += 1
+        time_left = self._time_left
+        if time_left is None:
+            return player.score(game, player)
+        start = time_left()
+        value = player.score(game, player)
+        self.eval_time += start - time_left()
+        return value
+
+    def add(self, counts):
+        """Add the counters of another search, given as a dict returned by
+        its `as_dict()` (e.g., the search of a helper process of a parallel
+        search), to these counters.
+        """
+        for name in ("nodes", "leaf_evals", "expanded", "moves", "cutoffs",
+                     "extensions", "eval_time"):
+            setattr(self, name, getattr(self, name) + counts[name])
+
+    def end_iteration(self, depth):
+        """Record that the search iteration to `depth` has been completed."""
+        now = self._time_left() if self._time_left is not None else 0.
+        self.iterations.append((depth, self.nodes - self._iteration_nodes,
+                                self._iteration_start - now))
+        self.depth_completed = depth
+        self._iteration_nodes = self.nodes
+        self._iteration_start = now
+
+    def finish(self):
+        """Record the time left on the clock when the move is returned."""
+        if self._time_left is not None:
+            self.time_unused = self._time_left()
+
+    @property
+    def branching_factor(self):
+        """The average number of legal moves at the expanded states."""
+        return self.moves / self.expanded if self.expanded else 0.
+
+    @property
+    def effective_branching_factor(self):
+        """The ratio of the number of nodes visited by the last two completed
+        iterations, or None if fewer than two iterations were completed.
+        """
+        if len(self.iterations) < 2 or not self.iterations[-2][1]:
+            return None
+        return self.iterations[-1][1] / self.iterations[-2][1]
+
+    @property
+    def cutoff_rate(self):
+        """The fraction of the expanded states that were cut off."""
+        return self.cutoffs / self.expanded if self.expanded else 0.
+
+    def as_dict(self):
+        """Return the counters and derived rates as a JSON serializable dict.
+        """
+        return {
+            "nodes": self.nodes,
+            "leaf_evals": self.leaf_evals,
+            "expanded": self.expanded,
+            "moves": self.moves,
+            "cutoffs": self.cutoffs,
+            "extensions": self.extensions,
+            "branching_factor": self.branching_factor,
+            "effective_branching_factor": self.effective_branching_factor,
+            "cutoff_rate": self.cutoff_rate,
+            "eval_time": self.eval_time,
+            "depth_completed": self.depth_completed,
+            "iterations": [list(iteration) for iteration in self.iterations],
+            "time_unused": self.time_unused,
+        }
+
+
+class TimeManager:
+    """Decide how long an agent searches each move.
+
+    The manager gives each move a soft budget and a hard limit. Iterative
+    deepening stops before the next iteration if that iteration is not
+    expected to finish within the soft budget; the time of the next
+    iteration is predicted by multiplying the time of the last one by the
+    effective branching factor (the ratio of the times of the last two
+    iterations). The search also stops as soon as the root is proven won or
+    lost, or once the best move has not changed for `stable_iterations`
+    iterations and half of the soft budget is used. Moves with a single
+    legal reply are played without searching.
+
+    Without a game clock the soft budget and the hard limit are both the
+    time allowed for the move. With a game clock (see `Board.play()`) the
+    soft budget is an equal share of the remaining game time over the
+    estimated number of moves left to play, and the hard limit is
+    `max_share` times the soft budget.
+
+    Parameters
+    ----------
+    game_time : float (optional)
+        The milliseconds on the agent's clock for the whole game, or None
+        if each move only has its own time limit.
+
+    stable_iterations : int (optional)
+        The number of consecutive iterations that must return the same
+        best move before the search stops early; None disables the test.
+
+    max_share : float (optional)
+        The hard limit of a move as a multiple of its soft budget when
+        playing with a game clock.
+
+    Attributes
+    ----------
+    remaining : float
+        The milliseconds left on the game clock (None without a clock).
+
+    budget : float
+        The soft budget of the current move, in milliseconds.
+    """
+    def __init__(self, game_time=None, stable_iterations=4, max_share=3.):
+        if game_time is not None and game_time <= 0:
+            raise ValueError("The game clock must be positive")
+        if max_share < 1:
+            raise ValueError("The hard limit cannot be below the budget")
+        self.game_time = game_time
+        self.stable_iterations = stable_iterations
+        self.max_share = max_share
+        self.remaining = game_time
+        self.budget = 0.
+        self._last_move_count = None
+        self._time_left = None
+
+    def start(self, game, time_left, threshold):
+        """Start timing a move in `game` and return the timer the search
+        should use: a function like `time_left` that reaches `threshold`
+        when the hard limit of the move is reached.
+        """
+        start = time_left()
+        limit = start - threshold
+        if self.game_time is not None:
+            # The clock restarts when a new game begins
+            if self._last_move_count is None or game.move_count <= self._last_move_count:
+                self.remaining = self.game_time
+            self._last_move_count = game.move_count
+            # Each player gets about one move in every four blank cells
+            moves_to_go = max(1, len(game.get_blank_spaces()) // 4)
+            self.budget = min(limit, (self.remaining - threshold) / moves_to_go)
+            limit = min(limit, self.budget * self.max_share)
+        else:
+            self.budget = limit
+        self._time_left = time_left
+        self._start = start
+        self._last_start = start
+        self._times = []
+        self._move = None
+        self._stable = 0
+        reserve = max(0., start - threshold - limit)
+        if not reserve:
+            return time_left
+        return lambda: time_left() - reserve
+
+    def stop(self, depth, move, value):
+        """Record the completed iteration to `depth` (its best move and root
+        value) and return True if the search should stop.
+        """
+        now = self._time_left()
+        self._times.append(self._last_start - now)
+        self._last_start = now
+        if value is not None and math.isinf(value):
+            return True
+
+        self._stable = self._stable + 1 if move == self._move else 1
+        self._move = move
+        used = self._start - now
+        if (self.stable_iterations is not None and
+                self._stable >= self.stable_iterations and
+                used >= self.budget / 2):
+            return True
+
+        if len(self._times) < 2 or self._times[-2] <= 0:
+            return False
+        factor = max(1., self._times[-1] / self._times[-2])
+        return used + self._times[-1] * factor > self.budget
+
+    def budget_left(self):
+        """Return the milliseconds left in the soft budget of the current
+        move.
+        """
+        return self.budget - (self._start - self._time_left())
+
+    def finish(self):
+        """Charge the time used by the move to the game clock."""
+        if self.remaining is not None:
+            self.remaining -= self._start - self._time_left()
+        self._time_left = None
+
+
+def _replace_player(game, old, new):
+    """Return a copy of `game` in which the player `old` is replaced by `new`.
+    """
+    game = game.copy()
+    for seat in ("_player_1", "_player_2", "_active_player", "_inactive_player"):
+        if getattr(game, seat) == old:
+            setattr(game, seat, new)
+    return game
+
+
+# The agent of a worker process of a parallel AlphaBetaPlayer
+_PARALLEL_AGENT = None
+
+
+def _init_parallel_worker(options):
+    """Create the agent of a worker process of a parallel AlphaBetaPlayer."""
+    global _PARALLEL_AGENT
+    _PARALLEL_AGENT = AlphaBetaPlayer(**options)
+
+
+def _parallel_search(game, root_moves, deadline, stats=False, time_manager=None):
+    """Run an iterative deepening search of `game` restricted to `root_moves`
+    in a worker process until the `time.perf_counter()` deadline, and return
+    the results of `AlphaBetaPlayer._iterative_deepening()` along with the
+    counters of the search (see `SearchStats.as_dict()`) if `stats` is True,
+    or None. The search stops early if `time_manager` (a fresh
+    `TimeManager`) decides so. The agent to move in `game` is the
+    placeholder "agent".
+    """
+    import time
+    agent = _PARALLEL_AGENT
+    game = _replace_player(game, "agent", agent)
+    time_left = lambda: 1000 * (deadline - time.perf_counter())
+    if time_manager is not None:
+        time_left = time_manager.start(game, time_left, agent.TIMER_THRESHOLD)
+    agent.time_manager = time_manager
+    agent.time_left = time_left
+    agent.stats = SearchStats() if stats else None
+    if stats:
+        agent.stats.reset(time_left)
+    agent._prepare_search(game)
+    results = agent._iterative_deepening(game, root_moves)
+    return results, agent.stats.as_dict() if stats else None
+
+
 class IsolationPlayer:
     """Base class for minimax and alphabeta agents -- this class is never
     constructed or tested directly.
@@ -184,7 +902,30 @@ class MinimaxPlayer(IsolationPlayer):
     """Game-playing agent that chooses a move using depth-limited minimax
     search. You must finish and test this player to make sure it properly uses
     minimax to return a good move before the search time limit expires.
+
+    Parameters
+    ----------
+    in_place : bool (optional)
+        If True, the search walks the game tree on a single private copy of
+        the board using `push()`/`pop()` instead of creating a new board
+        with `forecast_move()` for every node.
+
+    stats : SearchStats (optional)
+        If set, the counters are reset and filled in by every call to
+        `get_move()`.
+
+    Attributes
+    ----------
+    depth_reached : int
+        The depth of the search completed by the last call to `get_move()`
+        (0 if the search timed out).
     """
+    def __init__(self, search_depth=3, score_fn=custom_score, timeout=10.,
+                 in_place=False, stats=None):
+        super().__init__(search_depth, score_fn, timeout)
+        self.in_place = in_place
+        self.stats = stats
+        self.depth_reached = 0
 
     def get_move(self, game, time_left):
         """Search for the best move from the available legal moves and return a
@@ -215,19 +956,34 @@ class MinimaxPlayer(IsolationPlayer):
             (-1, -1) if there are no available legal moves.
         """
         self.time_left = time_left
+        stats = self.stats
+        if stats is not None:
+            stats.reset(time_left)
+
+        # In-place search mutates the board, so it runs on a private copy that
+        # can be discarded if the search is aborted by a timeout
+        if self.in_place:
+            game = game.copy()
 
         # Initialize the best move so that this function returns something
         # in case the search fails due to timeout
         best_move = (-1, -1)
+        self.depth_reached = 0
 
         try:
             # The try/except block will automatically catch the exception
             # raised when the timer is about to expire.
-            return self.minimax(game, self.search_depth)
+            best_move = self.minimax(game, self.search_depth)
+            self.depth_reached = self.search_depth
+            if stats is not None:
+                stats.end_iteration(self.search_depth)
 
         except SearchTimeout:
             pass  # Handle any actions required after timeout as needed
 
+        if stats is not None:
+            stats.finish()
+
         # Return the best move from the last completed search iteration
         return best_move
 
@@ -278,17 +1034,22 @@ class MinimaxPlayer(IsolationPlayer):
         utility=[]
         # First I get the legal moves for the actual state of the board
         legal_moves=game.get_legal_moves()
-        print(legal_moves)
+        stats = self.stats
+        if stats is not None:
+            stats.nodes += 1
         # If there is no legal_moves we have to return (-1,-1)
         if len(legal_moves)==0:
-            return (-1,1)
+            return (-1,-1)
+        if stats is not None:
+            stats.expanded += 1
+            stats.moves += len(legal_moves)
         
         # I made an iteration to get the utility value for each move aplying minmax
         for move in legal_moves:
             #I get a new game apliying the first move
-            print(move)
-            new_game= game.forecast_move(move)
+            new_game=make_move(game,move,self.in_place)
             utility.append(self.min_value(new_game,depth-1))
+            undo_move(game,self.in_place)
         #Taking the maximun value from the utility
         max_utility=max(utility)
         
@@ -321,14 +1082,24 @@ class MinimaxPlayer(IsolationPlayer):
         if self.time_left() < self.TIMER_THRESHOLD:
             raise SearchTimeout()
         
+        stats = self.stats
+        if stats is not None:
+            stats.nodes += 1
+
         if self.terminal_test(game) or (current_depth==0):
+            if stats is not None:
+                return stats.evaluate(self, game)
             return self.score(game,self)
         
         legal_moves=game.get_legal_moves()
+        if stats is not None:
+            stats.expanded += 1
+            stats.moves += len(legal_moves)
         
         for move in legal_moves:
-            new_game=game.forecast_move(move)
+            new_game=make_move(game,move,self.in_place)
             utility.append(self.min_value(new_game,current_depth-1))
+            undo_move(game,self.in_place)
         
         return max(utility)
     
@@ -356,14 +1127,24 @@ class MinimaxPlayer(IsolationPlayer):
         if self.time_left() < self.TIMER_THRESHOLD:
             raise SearchTimeout()
         
+        stats = self.stats
+        if stats is not None:
+            stats.nodes += 1
+
         if self.terminal_test(game) or (current_depth==0):
+            if stats is not None:
+                return stats.evaluate(self, game)
             return self.score(game,self)
         
         legal_moves=game.get_legal_moves()
+        if stats is not None:
+            stats.expanded += 1
+            stats.moves += len(legal_moves)
         
         for move in legal_moves:
-            new_game=game.forecast_move(move)
+            new_game=make_move(game,move,self.in_place)
             utility.append(self.max_value(new_game,current_depth-1))
+            undo_move(game,self.in_place)
         
         return min(utility)
         
@@ -382,9 +1163,7 @@ class MinimaxPlayer(IsolationPlayer):
             if the legal_moves=0 then is the end of the game 
         """
             
-        moves=game.get_legal_moves()
-        
-        if len(moves)==0:
+        if _mobility(game, game.active_player)==0:
             return True
         return False
     
@@ -392,7 +1171,168 @@ class AlphaBetaPlayer(IsolationPlayer):
     """Game-playing agent that chooses a move using iterative deepening minimax
     search with alpha-beta pruning. You must finish and test this player to
     make sure it returns a good move before the search time limit expires.
+
+    Parameters
+    ----------
+    in_place : bool (optional)
+        If True, the search walks the game tree on a single private copy of
+        the board using `push()`/`pop()` instead of creating a new board
+        with `forecast_move()` for every node.
+
+    tt : TranspositionTable (optional)
+        A transposition table used to reuse the results of searching states
+        that are reached by different move orders or by earlier iterations.
+
+    tt_persist : bool (optional)
+        If True, the contents of the transposition table are kept between
+        moves of the same game (the table is always cleared when a new game
+        starts); otherwise the table is cleared before every move.
+
+    move_ordering : bool (optional)
+        If True, each iterative deepening pass searches the root moves in
+        order of their scores from the previous pass and follows the previous
+        principal variation first; interior nodes try killer moves and then
+        the remaining moves ordered by the history heuristic.
+
+    search_mode : str (optional)
+        Either "alphabeta" (the default max_value/min_value search) or "pvs"
+        for a negamax Principal Variation Search that searches every move
+        after the first with a null window and only re-searches moves that
+        fail high.
+
+    aspiration : float (optional)
+        If set, every iterative deepening pass after the first searches the
+        window (v - aspiration, v + aspiration) around the score v of the
+        previous pass, widening the side that fails until the score falls
+        inside the window.
+
+    aspiration_growth : float (optional)
+        The factor applied to the width of the failing side of the window
+        before each re-search.
+
+    extensions : int (optional)
+        If set, a leaf where the player to move has at most this many legal
+        moves (1 extends only forced replies) is searched one ply deeper
+        instead of being scored, so forced lines are followed past the
+        search horizon. Extended nodes can be extended again.
+
+    extension_budget : int (optional)
+        The number of extra nodes that extensions may add to each iterative
+        deepening pass; once they are used up, leaves are scored as usual.
+
+    endgame : isolation.EndgameSolver (optional)
+        An exact solver for positions where the players have been separated.
+        Solved nodes score as proven wins or losses, and once the root itself
+        is partitioned the agent plays the solver's move without searching.
+
+    stats : SearchStats (optional)
+        If set, the counters are reset and filled in by every call to
+        `get_move()`.
+
+    workers : int (optional)
+        The number of processes used by each search. With more than one
+        worker the root moves are dealt out between this process and a pool
+        of `workers - 1` helper processes; each process runs iterative
+        deepening on its own share of the moves, and the agent plays the best
+        move of the deepest pass that every process completed. The helpers
+        stop `TIMER_THRESHOLD` milliseconds before the deadline of this
+        process so that their results arrive in time. Call `close()` to shut
+        the pool down.
+
+    book : isolation.OpeningBook (optional)
+        An opening book consulted before searching; positions found in the
+        book are answered with the book move without searching.
+
+    time_manager : TimeManager (optional)
+        If set, decides when each iterative deepening search stops (instead
+        of searching every move until the timer expires) and keeps the time
+        of a per-game clock.
+
+    tree : SearchTree (optional)
+        If set, records the game tree of the last completed iterative
+        deepening pass of every move, and reuses the subtree below the
+        actual reply at the start of the next move.
+
+    Attributes
+    ----------
+    depth_reached : int
+        The depth of the deepest iterative deepening pass completed by the
+        last call to `get_move()` (0 if no pass completed or the move was
+        chosen by the endgame solver or the opening book).
     """
+    def __init__(self, search_depth=3, score_fn=custom_score, timeout=10.,
+                 in_place=False, tt=None, tt_persist=True, move_ordering=False,
+                 search_mode="alphabeta", aspiration=None, aspiration_growth=4.,
+                 endgame=None, stats=None, workers=1, book=None,
+                 time_manager=None, tree=None, extensions=None,
+                 extension_budget=4096):
+        super().__init__(search_depth, score_fn, timeout)
+        self.endgame = endgame
+        self.book = book
+        self.time_manager = time_manager
+        self.tree = tree
+        self.stats = stats
+        if search_mode not in ("alphabeta", "pvs"):
+            raise ValueError("Unknown search mode: {}".format(search_mode))
+        if aspiration is not None and (aspiration <= 0 or aspiration_growth <= 1):
+            raise ValueError("Aspiration windows must have positive width and growth > 1")
+        self.search_mode = search_mode
+        self.aspiration = aspiration
+        self.aspiration_growth = aspiration_growth
+        if extensions is not None and (extensions < 1 or extension_budget < 0):
+            raise ValueError("Extensions need a move threshold >= 1 and a budget >= 0")
+        self.extensions = extensions
+        self.extension_budget = extension_budget
+        self._extension_nodes = extension_budget
+        self._root_value = None
+        self.in_place = in_place
+        self.tt = tt
+        self.tt_persist = tt_persist
+        self.move_ordering = move_ordering
+        self._last_move_count = None
+        self.depth_reached = 0
+        self._root_moves = None
+        self._reset_ordering()
+        if workers < 1:
+            raise ValueError("The number of workers must be at least 1")
+        self.workers = workers
+        self._pool = None
+        if workers > 1:
+            self._start_pool()
+
+    def __getstate__(self):
+        # The process pool and the timer of the current move stay behind
+        state = self.__dict__.copy()
+        state["_pool"] = None
+        state["time_left"] = None
+        return state
+
+    def _start_pool(self):
+        """ Start the helper processes of a parallel search. """
+        import multiprocessing
+        options = dict(
+            score_fn=self.score, timeout=2 * self.TIMER_THRESHOLD,
+            in_place=self.in_place, tt_persist=self.tt_persist,
+            move_ordering=self.move_ordering, search_mode=self.search_mode,
+            aspiration=self.aspiration, aspiration_growth=self.aspiration_growth,
+            extensions=self.extensions, extension_budget=self.extension_budget)
+        # Every helper gets its own empty table and solver
+        if self.endgame is not None:
+            endgame = self.endgame
+            options["endgame"] = type(endgame)(endgame.min_moves, endgame.max_nodes,
+                                               endgame.max_cache,
+                                               endgame.min_depth)
+        if self.tt is not None:
+            options["tt"] = TranspositionTable(self.tt.max_entries, self.tt.replacement)
+        self._pool = multiprocessing.Pool(self.workers - 1, _init_parallel_worker,
+                                          (options,))
+
+    def close(self):
+        """ Shut down the helper processes of a parallel search. """
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
 
     def get_move(self, game, time_left):
         """Search for the best move from the available legal moves and return a
@@ -424,26 +1364,205 @@ class AlphaBetaPlayer(IsolationPlayer):
             Board coordinates corresponding to a legal move; may return
             (-1, -1) if there are no available legal moves.
         """
+        time_manager = self.time_manager
+        if time_manager is None:
+            return self._get_move(game, time_left)
+        time_left = time_manager.start(game, time_left, self.TIMER_THRESHOLD)
+        try:
+            return self._get_move(game, time_left)
+        finally:
+            time_manager.finish()
+
+    def _get_move(self, game, time_left):
+        """ Choose the move for `get_move()` with the timer `time_left`. """
         self.time_left = time_left
+        self.depth_reached = 0
+        stats = self.stats
+        if stats is not None:
+            stats.reset(time_left)
+
+        # Book positions were searched offline far deeper than we can now
+        if self.book is not None:
+            move = self.book.lookup(game)
+            if move is not None and move in game.get_legal_moves():
+                if stats is not None:
+                    stats.finish()
+                return move
+
+        # A partitioned position is decided, so play the longest path directly
+        if self.endgame is not None:
+            move = self.endgame.best_move(game, time_left, self.TIMER_THRESHOLD)
+            if move is not None:
+                if stats is not None:
+                    stats.finish()
+                return move
+
+        # Forced moves are played at once when the time is being managed
+        if self.time_manager is not None:
+            legal_moves = game.get_legal_moves()
+            if len(legal_moves) == 1:
+                if stats is not None:
+                    stats.finish()
+                return legal_moves[0]
+
+        # In-place search mutates the board, so it runs on a private copy that
+        # can be discarded if the search is aborted by a timeout
+        if self.in_place:
+            game = game.copy()
+
+        self._prepare_search(game)
+
+        if self.workers > 1:
+            best_move = self._parallel_search(game)
+        else:
+            # Return (-1, -1) if the search fails due to timeout
+            results = self._iterative_deepening(game)
+            best_move = results[-1][2] if results else (-1, -1)
+
+        if stats is not None:
+            stats.finish()
 
-        # Initialize the best move so that this function returns something
-        # in case the search fails due to timeout
-        best_move = (-1, -1)
+        # Return the best move from the last completed search iteration
+        return best_move
 
+    def _prepare_search(self, game):
+        """ Reset the search state kept between moves before searching `game`.
+        """
+        # Values are stored from this player's point of view, so the table can
+        # only be reused while the player keeps the same seat in one game
+        if self.tt is not None:
+            if (not self.tt_persist or self._last_move_count is None or
+                    game.move_count <= self._last_move_count):
+                self.tt.clear()
+            self._last_move_count = game.move_count
+            self.tt.new_search()
+
+        self._reset_ordering()
+        self._root_value = None
+
+        # The subtree below the actual reply orders the first pass
+        if self.tree is not None:
+            self.tree.start(game, self)
+            if self.tree.reused and self.move_ordering:
+                self._root_scores = self.tree.root_scores()
+                self._set_pv(game, self.tree.principal_variation())
+
+    def _iterative_deepening(self, game, root_moves=None):
+        """ Search `game` to increasing depths until the timer expires. If
+        `root_moves` is given, only those moves are searched at the root.
+
+        Returns
+        -------
+        list<(int, float, (int, int))>
+            The depth, root value and best move of every completed pass.
+        """
+        stats = self.stats
+        results = []
+        self._root_moves = root_moves
         try:
             # The try/except block will automatically catch the exception
             # raised when the timer is about to expire.
+            search = self.pvs if self.search_mode == "pvs" else self.alphabeta
             depth = 1
             while True:
-                best_move= self.alphabeta(game, depth)
+                if self.aspiration is None:
+                    best_move= search(game, depth)
+                else:
+                    best_move= self._aspiration_search(search, game, depth)
+                results.append((depth, self._root_value, best_move))
+                self.depth_reached = depth
+                if stats is not None:
+                    stats.end_iteration(depth)
+                if (self.time_manager is not None and
+                        self.time_manager.stop(depth, best_move, self._root_value)):
+                    break
                 depth+=1
 
         except SearchTimeout:
             pass  # Handle any actions required after timeout as needed
 
-        # Return the best move from the last completed search iteration
+        finally:
+            self._root_moves = None
+        return results
+
+    def _parallel_search(self, game):
+        """ Deal out the root moves of `game` between this process and the
+        helper processes, and return the best move of the deepest pass that
+        was completed by every process that completed one.
+        """
+        legal_moves = game.get_legal_moves()
+        shares = [legal_moves[i::self.workers] for i in range(self.workers)]
+        shares = [share for share in shares if share]
+        if len(shares) < 2:
+            results = self._iterative_deepening(game)
+            return results[-1][2] if results else (-1, -1)
+
+        import multiprocessing
+        import time
+        if self._pool is None:
+            self._start_pool()
+
+        # The helpers get a copy of the board with placeholders for the
+        # players, and a deadline on the shared monotonic clock; a managed
+        # search gives them its soft budget, and each helper runs its own
+        # time manager within it
+        window = self.time_left()
+        time_manager = None
+        if self.time_manager is not None:
+            window = min(window, self.time_manager.budget_left() + self.TIMER_THRESHOLD)
+            time_manager = TimeManager(
+                stable_iterations=self.time_manager.stable_iterations)
+        deadline = time.perf_counter() + window / 1000
+        board = _replace_player(game, self, "agent")
+        board = _replace_player(board, game.get_opponent(self), "opponent")
+        task = (self.stats is not None, time_manager)
+        pending = [self._pool.apply_async(_parallel_search, (board, share, deadline) + task)
+                   for share in shares[1:]]
+
+        all_results = [self._iterative_deepening(game, shares[0])]
+        for result in pending:
+            wait = min(self.time_left() - self.TIMER_THRESHOLD / 2,
+                       1000 * (deadline - time.perf_counter()))
+            try:
+                results, counts = result.get(max(0., wait) / 1000)
+            except multiprocessing.TimeoutError:
+                continue
+            all_results.append(results)
+            if counts is not None and self.stats is not None:
+                self.stats.add(counts)
+
+        all_results = [results for results in all_results if results]
+        if not all_results:
+            return legal_moves[0]
+        depth = min(results[-1][0] for results in all_results)
+        self.depth_reached = depth
+        _, _, best_move = max((results[depth - 1] for results in all_results),
+                              key=lambda result: result[1])
         return best_move
 
+    def _aspiration_search(self, search, game, depth):
+        """ Run one iterative deepening pass of `search` with an aspiration
+        window centered on the score of the previous pass, re-searching with
+        a wider window whenever the root score falls outside of it.
+        """
+        guess = self._root_value
+        if guess is None or math.isinf(guess):
+            return search(game, depth)
+
+        lower = upper = self.aspiration
+        alpha, beta = guess - lower, guess + upper
+        while True:
+            move = search(game, depth, alpha, beta)
+            value = self._root_value
+            if value <= alpha and alpha > float("-inf"):
+                lower *= self.aspiration_growth
+                alpha = float("-inf") if math.isinf(value) else guess - lower
+            elif value >= beta and beta < float("inf"):
+                upper *= self.aspiration_growth
+                beta = float("inf") if math.isinf(value) else guess + upper
+            else:
+                return move
+
     def alphabeta(self, game, depth, alpha=float("-inf"), beta=float("inf")):
         """Implement depth-limited minimax search with alpha-beta pruning as
         described in the lectures.
@@ -495,20 +1614,76 @@ class AlphaBetaPlayer(IsolationPlayer):
         # TODO: finish this function!
     
         # First I get the legal moves for the actual state of the board
+        self._extension_nodes = self.extension_budget
         legal_moves=game.get_legal_moves()
+        if self._root_moves is not None:
+            legal_moves = [m for m in legal_moves if m in self._root_moves]
+        stats = self.stats
+        if stats is not None:
+            stats.nodes += 1
         # If there is no legal_moves we have to return (-1,-1)
         if len(legal_moves)==0:
-            return (-1,1)
-        
-        best_action= None
+            return (-1,-1)
+        if stats is not None:
+            stats.expanded += 1
+            stats.moves += len(legal_moves)
+
+        if self.tt is not None:
+            key = game.hash()
+            alpha_orig = alpha
+            legal_moves = self._tt_order(self.tt.lookup(key), legal_moves)
+
+        if self.move_ordering:
+            # Search the root moves in order of their scores from the previous
+            # iteration; moves that were not scored keep their random order
+            scores = self._root_scores
+            legal_moves.sort(key=lambda m: -scores.get(m, float("-inf")))
+            root_scores = {}
+            root_pv = []
+
+        tree = self.tree
+        if tree is not None:
+            tree.begin_pass(depth)
+
+        # Fall back to the first move if every move loses, so that the agent
+        # still returns a legal move
+        best_action = legal_moves[0]
+        best_utility = float("-inf")
         
         # I run through all the values in legal moves to obtain the best action
         for move in legal_moves:
-            new_game=game.forecast_move(move)
-            utility=self.min_value(new_game,depth-1, alpha,beta)
-            if utility > alpha:
-                alpha=utility
+            new_game=make_move(game,move,self.in_place)
+            if tree is not None:
+                tree.enter(move, depth - 1)
+            utility=self._search(new_game,depth-1,alpha,beta,False,1)
+            if tree is not None:
+                tree.exit(utility, alpha, beta)
+            undo_move(game,self.in_place)
+            if utility > best_utility:
+                best_utility=utility
                 best_action=move
+                if self.move_ordering:
+                    root_pv = [move] + self._pv_table.get(1, [])
+            if self.move_ordering:
+                root_scores[move] = utility
+            if best_utility >= beta:
+                if stats is not None:
+                    stats.cutoffs += 1
+                break
+            alpha=max(alpha,utility)
+
+        self._root_value = best_utility
+        if tree is not None:
+            tree.end_pass(best_utility)
+
+        # The value of a search restricted to some of the root moves is not
+        # the value of the position
+        if self.tt is not None and self._root_moves is None:
+            self._tt_store(key, depth, best_utility, alpha_orig, beta, best_action)
+
+        if self.move_ordering:
+            self._root_scores = root_scores
+            self._set_pv(game, root_pv)
                 
         return best_action
         
@@ -539,26 +1714,8 @@ class AlphaBetaPlayer(IsolationPlayer):
         int        
             The utility value for the movement
         """
-        
-        utility=float("-inf")
-        
-        if self.time_left() < self.TIMER_THRESHOLD:
-            raise SearchTimeout()
-        
-        if self.terminal_test(game) or (current_depth==0):
-            return self.score(game,self)
-        
-        legal_moves=game.get_legal_moves()
-        
-        for move in legal_moves:
-            new_game=game.forecast_move(move)
-            utility=max(utility,self.min_value(new_game,current_depth-1,alpha,beta))
-            if utility >= beta:
-                return utility
-            alpha=max(alpha,utility)
-        
-        return utility
-    
+        return self._search(game, current_depth, alpha, beta, True)
+
     def min_value(self,game,current_depth,alpha,beta):
         """ Implement a function to obtain the min value of a tree 
         
@@ -583,25 +1740,447 @@ class AlphaBetaPlayer(IsolationPlayer):
         int        
             The utility value for the movement
         """
-      
-        utility=float("inf")
-        
+        return self._search(game, current_depth, alpha, beta, False)
+
+    def _search(self, game, current_depth, alpha, beta, maximizing, ply=1):
+        """ Shared implementation of max_value() and min_value(); all values
+        are from the point of view of this player.
+
+        Parameters
+        ----------
+        game : isolation.Board
+            An instance of the Isolation game `Board` class representing the
+            current game state
+
+        current_depth : int
+            Depth is an integer representing the maximum number of plies to
+            search in the game tree before aborting
+
+        alpha : float
+            Alpha limits the lower bound of search on minimizing layers
+
+        beta : float
+            Beta limits the upper bound of search on maximizing layers
+
+        maximizing : bool
+            True if this player is the one to move in `game`
+
+        ply : int (optional)
+            The distance (in plies) of `game` from the root of the search
+
+        Returns
+        -------
+        float
+            The utility value for the movement
+        """
         if self.time_left() < self.TIMER_THRESHOLD:
             raise SearchTimeout()
-        
-        if self.terminal_test(game) or (current_depth==0):
-            return self.score(game,self)
-        
+
+        ordering = self.move_ordering
+        if ordering:
+            self._pv_table[ply] = []
+
+        stats = self.stats
+        if stats is not None:
+            stats.nodes += 1
+
         legal_moves=game.get_legal_moves()
-        
+
+        # Forced lines are followed past the horizon, where a static score
+        # of a player with one or two moves left is unreliable
+        if current_depth == 0 and legal_moves and self._extend(legal_moves):
+            current_depth = 1
+
+        if not legal_moves or current_depth==0:
+            if stats is not None:
+                return stats.evaluate(self, game)
+            return self.score(game,self)
+
+        endgame = self.endgame
+        if endgame is not None and current_depth >= endgame.min_depth:
+            solved = endgame.solve(game, self.time_left, self.TIMER_THRESHOLD)
+            if solved is not None:
+                return float("inf") if (solved > 0) == maximizing else float("-inf")
+
+        tt = self.tt
+        entry = None
+        if tt is not None:
+            key = game.hash()
+            entry = tt.lookup(key)
+            if entry is not None and entry[0] >= current_depth:
+                _, value, bound, _ = entry
+                if bound == TranspositionTable.EXACT:
+                    return value
+                if bound == TranspositionTable.LOWER:
+                    alpha = max(alpha, value)
+                else:
+                    beta = min(beta, value)
+                if alpha >= beta:
+                    return value
+            alpha_orig, beta_orig = alpha, beta
+
+        if ordering:
+            legal_moves = self._order_moves(game, legal_moves, ply, maximizing, entry)
+        elif entry is not None:
+            legal_moves = self._tt_order(entry, legal_moves)
+
+        if stats is not None:
+            stats.expanded += 1
+            stats.moves += len(legal_moves)
+
+        best_move = legal_moves[0]
+        utility = float("-inf") if maximizing else float("inf")
+
+        tree = self.tree
         for move in legal_moves:
-            new_game=game.forecast_move(move)
-            utility=min(utility,self.max_value(new_game,current_depth-1,alpha,beta))
-            if utility <= alpha:
-                return utility
-            beta=min(beta,utility)
-    
+            new_game=make_move(game,move,self.in_place)
+            if tree is not None:
+                tree.enter(move, current_depth - 1)
+            value=self._search(new_game,current_depth-1,alpha,beta,not maximizing,ply+1)
+            if tree is not None:
+                tree.exit(value, alpha, beta)
+            undo_move(game,self.in_place)
+            if maximizing:
+                if value > utility:
+                    utility, best_move = value, move
+                    if ordering and value > alpha:
+                        self._pv_table[ply] = [move] + self._pv_table.get(ply + 1, [])
+                if utility >= beta:
+                    if stats is not None:
+                        stats.cutoffs += 1
+                    if ordering:
+                        self._record_cutoff(move, ply, current_depth, maximizing)
+                    break
+                alpha=max(alpha,utility)
+            else:
+                if value < utility:
+                    utility, best_move = value, move
+                    if ordering and value < beta:
+                        self._pv_table[ply] = [move] + self._pv_table.get(ply + 1, [])
+                if utility <= alpha:
+                    if stats is not None:
+                        stats.cutoffs += 1
+                    if ordering:
+                        self._record_cutoff(move, ply, current_depth, maximizing)
+                    break
+                beta=min(beta,utility)
+
+        if tt is not None:
+            self._tt_store(key, current_depth, utility, alpha_orig, beta_orig, best_move)
+
+        return utility
+
+    def pvs(self, game, depth, alpha=float("-inf"), beta=float("inf")):
+        """Depth-limited Principal Variation Search (NegaScout) with the same
+        interface as `alphabeta()`.
+
+        The first move at each node is searched with the full (alpha, beta)
+        window; every later move is searched with a null window (alpha, a') --
+        where a' is the next float above alpha -- that can only prove the move
+        is no better than the best one so far, and is searched again with the
+        full window only if that test fails high.
+
+        Parameters
+        ----------
+        game : isolation.Board
+            An instance of the Isolation game `Board` class representing the
+            current game state
+
+        depth : int
+            Depth is an integer representing the maximum number of plies to
+            search in the game tree before aborting
+
+        alpha : float
+            Alpha limits the lower bound of search on minimizing layers
+
+        beta : float
+            Beta limits the upper bound of search on maximizing layers
+
+        Returns
+        -------
+        (int, int)
+            The board coordinates of the best move found in the current search;
+            (-1, -1) if there are no legal moves
+        """
+        if self.time_left() < self.TIMER_THRESHOLD:
+            raise SearchTimeout()
+
+        self._extension_nodes = self.extension_budget
+        legal_moves = game.get_legal_moves()
+        if self._root_moves is not None:
+            legal_moves = [m for m in legal_moves if m in self._root_moves]
+        stats = self.stats
+        if stats is not None:
+            stats.nodes += 1
+        if not legal_moves:
+            return (-1, -1)
+        if stats is not None:
+            stats.expanded += 1
+            stats.moves += len(legal_moves)
+
+        if self.tt is not None:
+            key = game.hash()
+            alpha_orig = alpha
+            legal_moves = self._tt_order(self.tt.lookup(key), legal_moves)
+
+        if self.move_ordering:
+            scores = self._root_scores
+            legal_moves.sort(key=lambda m: -scores.get(m, float("-inf")))
+            root_scores = {}
+            root_pv = []
+
+        tree = self.tree
+        if tree is not None:
+            tree.begin_pass(depth)
+
+        best_action = legal_moves[0]
+        best_utility = float("-inf")
+
+        for idx, move in enumerate(legal_moves):
+            new_game = make_move(game, move, self.in_place)
+            utility = self._negamax_child(new_game, move, depth - 1, alpha, beta, 1, idx == 0)
+            undo_move(game, self.in_place)
+            if utility > best_utility:
+                best_utility = utility
+                best_action = move
+                if self.move_ordering:
+                    root_pv = [move] + self._pv_table.get(1, [])
+            if self.move_ordering:
+                root_scores[move] = utility
+            if best_utility >= beta:
+                if stats is not None:
+                    stats.cutoffs += 1
+                break
+            alpha = max(alpha, utility)
+
+        self._root_value = best_utility
+        if tree is not None:
+            tree.end_pass(best_utility)
+
+        # The value of a search restricted to some of the root moves is not
+        # the value of the position
+        if self.tt is not None and self._root_moves is None:
+            self._tt_store(key, depth, best_utility, alpha_orig, beta, best_action)
+
+        if self.move_ordering:
+            self._root_scores = root_scores
+            self._set_pv(game, root_pv)
+
+        return best_action
+
+    def _negamax(self, game, depth, alpha, beta, ply):
+        """ Fail-soft negamax search with null-window probes used by `pvs()`.
+        Values (and the alpha, beta window) are from the point of view of the
+        player to move in `game`.
+
+        Parameters
+        ----------
+        game : isolation.Board
+            An instance of the Isolation game `Board` class representing the
+            current game state
+
+        depth : int
+            Depth is an integer representing the maximum number of plies to
+            search in the game tree before aborting
+
+        alpha : float
+            The lower bound of the search window
+
+        beta : float
+            The upper bound of the search window; the next float above alpha
+            for a null-window search
+
+        ply : int
+            The distance (in plies) of `game` from the root of the search
+
+        Returns
+        -------
+        float
+            The utility value of the state for the player to move
+        """
+        if self.time_left() < self.TIMER_THRESHOLD:
+            raise SearchTimeout()
+
+        ordering = self.move_ordering
+        if ordering:
+            self._pv_table[ply] = []
+
+        # Scores are always computed from this player's point of view
+        maximizing = game.active_player == self
+        sign = 1. if maximizing else -1.
+
+        stats = self.stats
+        if stats is not None:
+            stats.nodes += 1
+
+        legal_moves = game.get_legal_moves()
+        if depth == 0 and legal_moves and self._extend(legal_moves):
+            depth = 1
+        if not legal_moves or depth == 0:
+            if stats is not None:
+                return sign * stats.evaluate(self, game)
+            return sign * self.score(game, self)
+
+        endgame = self.endgame
+        if endgame is not None and depth >= endgame.min_depth:
+            solved = endgame.solve(game, self.time_left, self.TIMER_THRESHOLD)
+            if solved is not None:
+                return float("inf") if solved > 0 else float("-inf")
+
+        tt = self.tt
+        entry = None
+        if tt is not None:
+            key = game.hash()
+            entry = tt.lookup(key)
+            if entry is not None and entry[0] >= depth:
+                _, value, bound, _ = entry
+                # Entries hold values for this player, so the bounds swap at
+                # the nodes where the opponent is to move
+                value *= sign
+                if bound == TranspositionTable.EXACT:
+                    return value
+                if (bound == TranspositionTable.LOWER) == maximizing:
+                    alpha = max(alpha, value)
+                else:
+                    beta = min(beta, value)
+                if alpha >= beta:
+                    return value
+            alpha_orig, beta_orig = alpha, beta
+
+        if ordering:
+            legal_moves = self._order_moves(game, legal_moves, ply, maximizing, entry)
+        elif entry is not None:
+            legal_moves = self._tt_order(entry, legal_moves)
+
+        if stats is not None:
+            stats.expanded += 1
+            stats.moves += len(legal_moves)
+
+        best_move = legal_moves[0]
+        utility = float("-inf")
+
+        for idx, move in enumerate(legal_moves):
+            new_game = make_move(game, move, self.in_place)
+            value = self._negamax_child(new_game, move, depth - 1, alpha, beta, ply + 1, idx == 0)
+            undo_move(game, self.in_place)
+            if value > utility:
+                utility, best_move = value, move
+                if ordering and value > alpha:
+                    self._pv_table[ply] = [move] + self._pv_table.get(ply + 1, [])
+            if utility >= beta:
+                if stats is not None:
+                    stats.cutoffs += 1
+                if ordering:
+                    self._record_cutoff(move, ply, depth, maximizing)
+                break
+            alpha = max(alpha, utility)
+
+        if tt is not None:
+            if utility >= beta_orig:
+                bound = TranspositionTable.LOWER
+            elif utility <= alpha_orig:
+                bound = TranspositionTable.UPPER
+            else:
+                bound = TranspositionTable.EXACT
+            if not maximizing and bound != TranspositionTable.EXACT:
+                bound = TranspositionTable.LOWER + TranspositionTable.UPPER - bound
+            tt.store(key, depth, sign * utility, bound, best_move)
+
         return utility
+
+    def _negamax_child(self, game, move, depth, alpha, beta, ply, first):
+        """ Return the value of the child `game` reached by `move` for the
+        parent in `_negamax()` (or `pvs()`) with the (alpha, beta) window of
+        the parent: a full window search for the first move, and otherwise a
+        null-window probe that is searched again if it fails high.
+        """
+        tree = self.tree
+        high = beta if first else _next_above(alpha)
+        while True:
+            if tree is not None:
+                tree.enter(move, depth)
+            value = -self._negamax(game, depth, -high, -alpha, ply)
+            if tree is not None:
+                # The parent is a node of this player at even plies
+                tree.exit(value, alpha, high, 1. if ply % 2 else -1.)
+            if high == beta or not alpha < value < beta:
+                return value
+            high = beta
+
+    def _extend(self, legal_moves):
+        """ Return True if a leaf with the given legal moves is searched one
+        ply deeper, charging its children to the extension budget.
+        """
+        count = len(legal_moves)
+        if (self.extensions is None or count > self.extensions or
+                count > self._extension_nodes):
+            return False
+        self._extension_nodes -= count
+        if self.stats is not None:
+            self.stats.extensions += 1
+        return True
+
+    def _reset_ordering(self):
+        """ Forget the move ordering information gathered by earlier searches.
+        """
+        self._root_scores = {}
+        self._pv_moves = {}
+        self._pv_table = {}
+        self._killers = {}
+        self._history = ({}, {})
+
+    def _set_pv(self, game, pv):
+        """ Remember the principal variation of a completed iteration as a map
+        from the hash of each state along the line to the move played there.
+        """
+        self._pv_moves = {}
+        board = game.copy()
+        for move in pv:
+            self._pv_moves[board.hash()] = move
+            board.apply_move(move)
+
+    def _order_moves(self, game, legal_moves, ply, maximizing, entry=None):
+        """ Order moves for search: the principal variation move from the
+        previous iteration, then the transposition table move, then the killer
+        moves for this ply, then the rest by their history heuristic score.
+        The sort is stable, so ties keep the random move generation order.
+        """
+        pv_move = self._pv_moves.get(game.hash())
+        tt_move = entry[3] if entry is not None else None
+        killers = self._killers.get(ply, ())
+        history = self._history[maximizing]
+        return sorted(legal_moves, key=lambda m: (
+            m != pv_move, m != tt_move, m not in killers, -history.get(m, 0)))
+
+    def _record_cutoff(self, move, ply, depth, maximizing):
+        """ Update the killer moves and history scores after `move` caused a
+        cutoff at the given ply with `depth` plies left to search.
+        """
+        killers = self._killers.get(ply, [])
+        if move not in killers:
+            self._killers[ply] = [move] + killers[:1]
+        history = self._history[maximizing]
+        history[move] = history.get(move, 0) + depth * depth
+
+    def _tt_order(self, entry, legal_moves):
+        """ Move the best move stored in a transposition table entry to the
+        front of the list of legal moves so that it is searched first.
+        """
+        if entry is not None and entry[3] in legal_moves and legal_moves[0] != entry[3]:
+            legal_moves = [entry[3]] + [m for m in legal_moves if m != entry[3]]
+        return legal_moves
+
+    def _tt_store(self, key, depth, value, alpha, beta, move):
+        """ Store a search result in the transposition table along with the
+        type of bound it represents for the (alpha, beta) search window.
+        """
+        if value <= alpha:
+            bound = TranspositionTable.UPPER
+        elif value >= beta:
+            bound = TranspositionTable.LOWER
+        else:
+            bound = TranspositionTable.EXACT
+        self.tt.store(key, depth, value, bound, move)
         
     def terminal_test(self,game):
         """ Determine if the game is at the end for the player
@@ -618,9 +2197,7 @@ class AlphaBetaPlayer(IsolationPlayer):
             if the legal_moves=0 then is the end of the game 
         """
             
-        moves=game.get_legal_moves()
-        
-        if len(moves)==0:
+        if _mobility(game, game.active_player)==0:
             return True
         return False
      
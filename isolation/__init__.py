@@ -8,4 +8,8 @@ legal moves loses, and the opponent is declared the winner.
 """
 
 # Make the Board class available at the root of the module for imports
-from .isolation import Board
+from .isolation import Board, cell_coords, knight_moves, knight_masks
+from .bitboard import BitBoard
+from .endgame import EndgameSolver
+from .symmetry import canonical_hash, canonicalize
+from .book import OpeningBook
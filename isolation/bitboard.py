@@ -0,0 +1,306 @@
+"""
+This file contains the `BitBoard` class, a drop-in replacement for
+`isolation.Board` that stores the blocked cells of the game as a single
+integer bitmask and each player location as a cell index.
+
+Cells are indexed exactly as in `isolation.Board` (i.e., the cell at
+(row, column) has index `row + column * height`), so the two classes produce
+identical game trees and can be used interchangeably by any agent.
+"""
+import random
+
+from .isolation import Board, _knight_tables, _zobrist_keys
+
+
+class BitBoard(Board):
+    """Implement a model for the game Isolation assuming each player moves like
+    a knight in chess, using a bitmask to store the blocked cells.
+
+    The public interface is identical to `isolation.Board`.
+
+    Parameters
+    ----------
+    player_1 : object
+        An object with a get_move() function. This is the only function
+        directly called by the Board class for each player.
+
+    player_2 : object
+        An object with a get_move() function. This is the only function
+        directly called by the Board class for each player.
+
+    width : int (optional)
+        The number of columns that the board should have.
+
+    height : int (optional)
+        The number of rows that the board should have.
+    """
+    __slots__ = ("_occupied", "_p1_loc", "_p2_loc", "_initiative", "_masks")
+
+    def __init__(self, player_1, player_2, width=7, height=7):
+        self.width = width
+        self.height = height
+        self.move_count = 0
+        self._player_1 = player_1
+        self._player_2 = player_2
+        self._active_player = player_1
+        self._inactive_player = player_2
+        self.shuffle_moves = True
+
+        # Blocked cells are set bits of `_occupied`; player locations are cell
+        # indices (or NOT_MOVED), and `_initiative` is 0 for player 1 to move
+        self._occupied = 0
+        self._p1_loc = Board.NOT_MOVED
+        self._p2_loc = Board.NOT_MOVED
+        self._initiative = 0
+        self._coords, _, self._masks = _knight_tables(width, height)
+
+        # Zobrist hash (identical to the hash of an equivalent `Board`)
+        self._zobrist = _zobrist_keys(width, height)
+        self._hash = 0
+
+        # Stack of (cell index, previous location, previous hash) entries
+        # used by pop() to undo the moves applied with push()
+        self._undo_stack = []
+
+    def hash(self):
+        """Return a 64-bit Zobrist hash of the current state covering the
+        blocked cells, both player locations, and the player to move.
+        """
+        return self._hash
+
+    def copy(self):
+        """ Return a deep copy of the current board. """
+        new_board = BitBoard.__new__(BitBoard)
+        new_board.width = self.width
+        new_board.height = self.height
+        new_board.move_count = self.move_count
+        new_board._player_1 = self._player_1
+        new_board._player_2 = self._player_2
+        new_board._active_player = self._active_player
+        new_board._inactive_player = self._inactive_player
+        new_board.shuffle_moves = self.shuffle_moves
+        new_board._occupied = self._occupied
+        new_board._p1_loc = self._p1_loc
+        new_board._p2_loc = self._p2_loc
+        new_board._initiative = self._initiative
+        new_board._coords = self._coords
+        new_board._masks = self._masks
+        new_board._zobrist = self._zobrist
+        new_board._hash = self._hash
+        new_board._undo_stack = []
+        return new_board
+
+    def move_is_legal(self, move):
+        """Test whether a move is legal in the current game state.
+
+        Parameters
+        ----------
+        move : (int, int)
+            A coordinate pair (row, column) indicating the next position for
+            the active player on the board.
+
+        Returns
+        -------
+        bool
+            Returns True if the move is legal, False otherwise
+        """
+        return (0 <= move[0] < self.height and 0 <= move[1] < self.width and
+                not self._occupied >> (move[0] + move[1] * self.height) & 1)
+
+    def get_blank_spaces(self):
+        """Return a list of the locations that are still available on the board.
+        """
+        return [(i, j) for j in range(self.width) for i in range(self.height)
+                if not self._occupied >> (i + j * self.height) & 1]
+
+    def get_player_location(self, player):
+        """Find the current location of the specified player on the board.
+
+        Parameters
+        ----------
+        player : object
+            An object registered as a player in the current game.
+
+        Returns
+        -------
+        (int, int) or None
+            The coordinate pair (row, column) of the input player, or None
+            if the player has not moved.
+        """
+        if player == self._player_1:
+            idx = self._p1_loc
+        elif player == self._player_2:
+            idx = self._p2_loc
+        else:
+            raise RuntimeError(
+                "Invalid player in get_player_location: {}".format(player))
+        if idx == Board.NOT_MOVED:
+            return Board.NOT_MOVED
+        return self._coords[idx]
+
+    def get_legal_moves(self, player=None, shuffle=None):
+        """Return the list of all legal moves for the specified player.
+
+        Parameters
+        ----------
+        player : object (optional)
+            An object registered as a player in the current game. If None,
+            return the legal moves for the active player on the board.
+
+        shuffle : bool (optional)
+            Whether to return the moves in random order. If None, use the
+            `shuffle_moves` setting of the board.
+
+        Returns
+        -------
+        list<(int, int)>
+            The list of coordinate pairs (row, column) of all legal moves
+            for the player constrained by the current game state.
+        """
+        if player is None:
+            player = self._active_player
+        if player == self._player_1:
+            idx = self._p1_loc
+        elif player == self._player_2:
+            idx = self._p2_loc
+        else:
+            raise RuntimeError(
+                "Invalid player in get_legal_moves: {}".format(player))
+        if idx == Board.NOT_MOVED:
+            return self.get_blank_spaces()
+
+        coords = self._coords
+        valid_moves = []
+        free = self._masks[idx] & ~self._occupied
+        while free:
+            bit = free & -free
+            valid_moves.append(coords[bit.bit_length() - 1])
+            free ^= bit
+        if shuffle or (shuffle is None and self.shuffle_moves):
+            random.shuffle(valid_moves)
+        return valid_moves
+
+    def _location_index(self, player):
+        """Return the cell index of the specified player (or NOT_MOVED)."""
+        if player == self._player_1:
+            return self._p1_loc
+        elif player == self._player_2:
+            return self._p2_loc
+        raise RuntimeError("Invalid player in mobility: {}".format(player))
+
+    def mobility(self, player=None):
+        """Return the number of legal moves for the specified player (see
+        `isolation.Board.mobility()`) as a population count of its free
+        move mask.
+        """
+        if player is None:
+            player = self._active_player
+        loc = self._location_index(player)
+        if loc == Board.NOT_MOVED:
+            return self.width * self.height - bin(self._occupied).count("1")
+        return bin(self._masks[loc] & ~self._occupied).count("1")
+
+    def weighted_mobility(self, player=None):
+        """Return the number of second-order moves of the specified player
+        (see `isolation.Board.weighted_mobility()`) as a population count of
+        the union of the move masks of its free move cells.
+        """
+        if player is None:
+            player = self._active_player
+        loc = self._location_index(player)
+        if loc == Board.NOT_MOVED:
+            return self.width * self.height - bin(self._occupied).count("1")
+        masks = self._masks
+        free = ~self._occupied
+        first = masks[loc] & free
+        reachable = 0
+        while first:
+            bit = first & -first
+            reachable |= masks[bit.bit_length() - 1]
+            first ^= bit
+        return bin(reachable & free).count("1")
+
+    def apply_move(self, move):
+        """Move the active player to a specified location.
+
+        Parameters
+        ----------
+        move : (int, int)
+            A coordinate pair (row, column) indicating the next position for
+            the active player on the board.
+        """
+        idx = move[0] + move[1] * self.height
+        cell_keys, player_keys, side_key = self._zobrist
+        location_keys = player_keys[self._initiative]
+        if self._initiative:
+            last_move, self._p2_loc = self._p2_loc, idx
+        else:
+            last_move, self._p1_loc = self._p1_loc, idx
+        if last_move != Board.NOT_MOVED:
+            self._hash ^= location_keys[last_move]
+        self._hash ^= location_keys[idx] ^ cell_keys[idx] ^ side_key
+        self._occupied |= 1 << idx
+        self._initiative ^= 1
+        self._active_player, self._inactive_player = self._inactive_player, self._active_player
+        self.move_count += 1
+
+    def push(self, move):
+        """Apply a move in-place like `apply_move()`, but remember enough
+        information that the move can be undone by a matching call to `pop()`.
+
+        Parameters
+        ----------
+        move : (int, int)
+            A coordinate pair (row, column) indicating the next position for
+            the active player on the board.
+        """
+        self._undo_stack.append((move[0] + move[1] * self.height,
+                                 self._p2_loc if self._initiative else self._p1_loc,
+                                 self._hash))
+        self.apply_move(move)
+
+    def pop(self):
+        """Undo the most recent move applied with `push()` and restore the
+        board to exactly the state it had before that move.
+
+        Returns
+        -------
+        (int, int)
+            The coordinate pair (row, column) of the move that was undone.
+        """
+        idx, last_move, self._hash = self._undo_stack.pop()
+        self._initiative ^= 1
+        if self._initiative:
+            self._p2_loc = last_move
+        else:
+            self._p1_loc = last_move
+        self._occupied &= ~(1 << idx)
+        self._active_player, self._inactive_player = self._inactive_player, self._active_player
+        self.move_count -= 1
+        return self._coords[idx]
+
+    def to_string(self, symbols=['1', '2']):
+        """Generate a string representation of the current game state, marking
+        the location of each player and indicating which cells have been
+        blocked, and which remain open.
+        """
+        col_margin = len(str(self.height - 1)) + 1
+        prefix = "{:<" + "{}".format(col_margin) + "}"
+        offset = " " * (col_margin + 3)
+        out = offset + '   '.join(map(str, range(self.width))) + '\n\r'
+        for i in range(self.height):
+            out += prefix.format(i) + ' | '
+            for j in range(self.width):
+                idx = i + j * self.height
+                if not self._occupied >> idx & 1:
+                    out += ' '
+                elif self._p1_loc == idx:
+                    out += symbols[0]
+                elif self._p2_loc == idx:
+                    out += symbols[1]
+                else:
+                    out += '-'
+                out += ' | '
+            out += '\n\r'
+
+        return out
@@ -0,0 +1,107 @@
+"""
+This file contains an opening book for Isolation: a table of the moves
+chosen by deep offline searches of the positions at the start of the game.
+
+Positions are keyed by their canonical hash (see `isolation.symmetry`), so
+the eight orientations of a position on a square board (or the four
+orientations on a rectangular board) share a single entry. Books are saved
+as flat binary arrays of keys and moves that are loaded with
+`array.fromfile()` and searched by bisection, so loading a book takes no
+longer than reading the file.
+"""
+from array import array
+from bisect import bisect_left
+
+from .symmetry import canonical_hash, symmetries, transform_move
+
+_MAGIC = 0x49534f4c  # "ISOL"
+_VERSION = 1
+
+
+class OpeningBook:
+    """Table of book moves for the positions reached in the first `plies`
+    moves of a game on a board of the given size.
+
+    Parameters
+    ----------
+    width : int (optional)
+        The number of columns of the board.
+
+    height : int (optional)
+        The number of rows of the board.
+
+    plies : int (optional)
+        The book only covers positions with fewer than this many moves
+        played; `lookup()` returns None for later positions without hashing
+        them.
+    """
+
+    def __init__(self, width=7, height=7, plies=4):
+        self.width = width
+        self.height = height
+        self.plies = plies
+        self._keys = array("Q")
+        self._moves = array("H")
+        self._entries = {}
+
+    def __len__(self):
+        return len(self._keys) + sum(1 for key in self._entries
+                                     if self._loaded_move(key) is None)
+
+    def _loaded_move(self, key):
+        """Return the move (canonical cell index) loaded from the book file
+        for `key`, or None if the file has no entry for it.
+        """
+        idx = bisect_left(self._keys, key)
+        if idx < len(self._keys) and self._keys[idx] == key:
+            return self._moves[idx]
+        return None
+
+    def lookup(self, game):
+        """Return the book move for the player to move in `game` as a
+        (row, column) pair, or None if the position is not in the book.
+        """
+        if (game.move_count >= self.plies or game.width != self.width or
+                game.height != self.height):
+            return None
+        key, symmetry = canonical_hash(game)
+        move = self._entries.get(key)
+        if move is None:
+            move = self._loaded_move(key)
+        if move is None:
+            return None
+        move = (move % self.height, move // self.height)
+        return transform_move(move, symmetry, self.width, self.height, inverse=True)
+
+    def store(self, game, move):
+        """Add (or replace) the book move for the position of `game`."""
+        if game.width != self.width or game.height != self.height:
+            raise ValueError("The board does not match the size of the book")
+        key, symmetry = canonical_hash(game)
+        perm = symmetries(self.width, self.height)[symmetry]
+        self._entries[key] = perm[move[0] + move[1] * self.height]
+
+    def save(self, path):
+        """Write the book to the file `path`."""
+        entries = dict(zip(self._keys, self._moves))
+        entries.update(self._entries)
+        keys = sorted(entries)
+        with open(path, "wb") as book:
+            array("Q", [_MAGIC, _VERSION, self.width, self.height, self.plies,
+                        len(keys)]).tofile(book)
+            array("Q", keys).tofile(book)
+            array("H", [entries[key] for key in keys]).tofile(book)
+
+    @classmethod
+    def load(cls, path):
+        """Read a book written by `save()` from the file `path`."""
+        header = array("Q")
+        with open(path, "rb") as book:
+            header.fromfile(book, 6)
+            magic, version, width, height, plies, count = header
+            if magic != _MAGIC or version != _VERSION:
+                raise ValueError("Not an opening book file: {}".format(path))
+            opening_book = cls(width, height, plies)
+            opening_book._keys.fromfile(book, count)
+            opening_book._moves.fromfile(book, count)
+        return opening_book
@@ -0,0 +1,313 @@
+"""
+This file contains an exact solver for Isolation endgames in which the two
+players have been separated into regions of the board that the other player
+can never reach.
+
+Once the players are partitioned neither of them can block the other, so
+the game reduces to two independent longest-path problems: the player to
+move wins if and only if the longest knight tour available in its own region
+is strictly longer than the longest tour available to its opponent.
+"""
+from .isolation import knight_masks
+
+
+class _BudgetExceeded(Exception):
+    """Raised when a longest path search exceeds its node budget."""
+    pass
+
+
+class _OutOfTime(Exception):
+    """Raised when a longest path search runs out of search time."""
+    pass
+
+
+def _board_bits(game):
+    """Return the tuple (blank cells mask, active player cell index, inactive
+    player cell index) for an `isolation.Board` or `isolation.BitBoard`; the
+    player indices are None for players that have not moved yet.
+    """
+    if hasattr(game, "_occupied"):
+        blank = ~game._occupied & ((1 << (game.width * game.height)) - 1)
+        locs = (game._p1_loc, game._p2_loc)
+        first = game._initiative
+    else:
+        state = game._board_state
+        blank = 0
+        for idx in range(game.width * game.height):
+            if not state[idx]:
+                blank |= 1 << idx
+        locs = (state[-1], state[-2])
+        first = state[-3]
+    return blank, locs[first], locs[1 - first]
+
+
+def reachable(masks, start, blank, stop=0):
+    """Return the mask of blank cells that a knight starting on cell index
+    `start` can eventually reach by moving only through blank cells, or None
+    as soon as the knight can reach one of the cells of the mask `stop`.
+
+    Parameters
+    ----------
+    masks : tuple<int>
+        The knight move masks of the board geometry (see `knight_masks`).
+
+    start : int
+        The cell index of the knight.
+
+    blank : int
+        The mask of cells that are still open.
+
+    stop : int (optional)
+        A mask of cells that ends the search early when it is reached.
+    """
+    region = 0
+    frontier = masks[start] & blank
+    while frontier:
+        if frontier & stop:
+            return None
+        region |= frontier
+        step = 0
+        while frontier:
+            bit = frontier & -frontier
+            step |= masks[bit.bit_length() - 1]
+            frontier ^= bit
+        frontier = step & blank & ~region
+    return region
+
+
+def partition(game):
+    """Test whether the players on the board have been separated.
+
+    Parameters
+    ----------
+    game : isolation.Board
+        An instance of `isolation.Board` or `isolation.BitBoard`.
+
+    Returns
+    -------
+    (int, int) or None
+        The masks of the cells reachable by the active and the inactive
+        player if the two regions are disjoint; None if the players can
+        still interact (or have not both been placed on the board).
+    """
+    blank, active, inactive = _board_bits(game)
+    if active is None or inactive is None:
+        return None
+    masks = knight_masks(game.width, game.height)
+    # Knight moves are reversible, so the regions share a cell if and only
+    # if the active player can reach one of the moves of the inactive
+    # player; the fill stops there, which is usually after a step or two
+    # while the players can still interact
+    active_region = reachable(masks, active, blank, masks[inactive] & blank)
+    if active_region is None:
+        return None
+    return active_region, reachable(masks, inactive, blank)
+
+
+def _greedy_length(masks, start, region):
+    """Return the length of the knight path from cell `start` through the
+    cells of `region` that always moves to the cell with the fewest onward
+    moves (Warnsdorff's rule), a lower bound on the longest path.
+    """
+    length = 0
+    options = masks[start] & region
+    while options:
+        best, fewest = 0, None
+        while options:
+            bit = options & -options
+            options ^= bit
+            onward = bin(masks[bit.bit_length() - 1] & region).count("1")
+            if fewest is None or onward < fewest:
+                best, fewest = bit, onward
+        region ^= best
+        length += 1
+        options = masks[best.bit_length() - 1] & region
+    return length
+
+
+class EndgameSolver:
+    """Exact solver for partitioned Isolation positions.
+
+    Longest paths are computed by depth-first search memoized on (cell,
+    remaining region) pairs, and the result of `solve()` is memoized on the
+    hash of the position. The memos are kept between calls, so repeated
+    queries from a game tree search (such as the nodes revisited by every
+    iterative deepening pass) are answered from the cache.
+
+    Parameters
+    ----------
+    min_moves : int (optional)
+        Positions with fewer than this many moves played are never tested for
+        a partition (the test is wasted effort early in the game).
+
+    max_nodes : int (optional)
+        The maximum number of new (cell, region) states explored by a single
+        call to `solve()` or `best_move()`; positions whose regions are too
+        large to solve within the budget are reported as unsolved.
+
+    max_cache : int (optional)
+        The memos are cleared whenever they grow beyond this many entries.
+
+    min_depth : int (optional)
+        Searches only call `solve()` at interior nodes with at least this
+        many plies left to search; solving a node costs far more than
+        searching a shallow subtree, and most nodes have few plies left.
+    """
+
+    def __init__(self, min_moves=10, max_nodes=2000, max_cache=50000,
+                 min_depth=2):
+        self.min_moves = min_moves
+        self.max_nodes = max_nodes
+        self.max_cache = max_cache
+        self.min_depth = min_depth
+        self._memo = {}
+        self._results = {}
+        self._unsolved = set()
+        self._budget = 0
+        self._time_left = None
+        self._threshold = 0.
+
+    def _longest(self, masks, start, region):
+        """Return the length of the longest knight path from `start` that only
+        visits cells in `region` (each cell at most once).
+        """
+        key = (start, region)
+        length = self._memo.get(key)
+        if length is not None:
+            return length
+        self._budget -= 1
+        if self._budget < 0:
+            raise _BudgetExceeded()
+        if (not self._budget & 127 and self._time_left is not None and
+                self._time_left() < self._threshold):
+            raise _OutOfTime()
+        length = 0
+        limit = bin(region).count("1")
+        options = masks[start] & region
+        while options and length < limit:
+            bit = options & -options
+            options ^= bit
+            length = max(length, 1 + self._longest(masks, bit.bit_length() - 1, region ^ bit))
+        self._memo[key] = length
+        return length
+
+    def _path_length(self, masks, start, region, timeouts=False):
+        """Return the length of the longest knight path from cell `start`
+        through the cells of `region`, or None if it cannot be computed
+        within the remaining node budget (or the time limit, unless
+        `timeouts` is True, in which case _OutOfTime is raised).
+        """
+        if (start, region) in self._unsolved:
+            return None
+        try:
+            return self._longest(masks, start, region)
+        except _BudgetExceeded:
+            self._unsolved.add((start, region))
+        except _OutOfTime:
+            if timeouts:
+                raise
+        return None
+
+    def _reset_budget(self, time_left=None, threshold=0.):
+        """Start a new query with a fresh node budget and search timer."""
+        if len(self._memo) > self.max_cache:
+            self._memo.clear()
+            self._unsolved.clear()
+        if len(self._results) > self.max_cache:
+            self._results.clear()
+        self._budget = self.max_nodes
+        self._time_left = time_left
+        self._threshold = threshold
+
+    def longest_path(self, masks, start, region):
+        """Return the length of the longest knight path from cell `start`
+        through the cells of `region`, or None if it cannot be computed
+        within the node budget.
+        """
+        self._reset_budget()
+        return self._path_length(masks, start, region)
+
+    def solve(self, game, time_left=None, threshold=0.):
+        """Solve a partitioned position.
+
+        Parameters
+        ----------
+        game : isolation.Board
+            An instance of `isolation.Board` or `isolation.BitBoard`.
+
+        time_left : callable (optional)
+            A function that returns the number of milliseconds left in the
+            current turn; the solver gives up (returning None) once it falls
+            below `threshold`.
+
+        threshold : float (optional)
+            The time (in milliseconds) to leave on the timer.
+
+        Returns
+        -------
+        int or None
+            1 if the player to move wins, -1 if the player to move loses, or
+            None if the players are not partitioned or the position could not
+            be solved within the node budget.
+        """
+        if game.move_count < self.min_moves:
+            return None
+        key = game.hash()
+        if key in self._results:
+            return self._results[key]
+        self._reset_budget(time_left, threshold)
+        try:
+            result = self._solve(game)
+        except _OutOfTime:
+            # Running out of time says nothing about the position
+            return None
+        self._results[key] = result
+        return result
+
+    def _solve(self, game):
+        """Return the result of `solve()` for `game`; raises _OutOfTime if
+        the timer runs out.
+        """
+        regions = partition(game)
+        if regions is None:
+            return None
+        _, active, inactive = _board_bits(game)
+        masks = knight_masks(game.width, game.height)
+        # A path never visits more cells than its region holds, so greedy
+        # paths settle most lopsided positions without an exact search
+        if _greedy_length(masks, active, regions[0]) > bin(regions[1]).count("1"):
+            return 1
+        if _greedy_length(masks, inactive, regions[1]) >= bin(regions[0]).count("1"):
+            return -1
+        active_length = self._path_length(masks, active, regions[0], True)
+        if active_length is None:
+            return None
+        inactive_length = self._path_length(masks, inactive, regions[1], True)
+        if inactive_length is None:
+            return None
+        return 1 if active_length > inactive_length else -1
+
+    def best_move(self, game, time_left=None, threshold=0.):
+        """Return the move that starts the longest path available to the
+        player to move in a partitioned position (which is optimal whether
+        the position is won or lost), or None if the position is not
+        partitioned or could not be solved within the node budget or the
+        time limit (see `solve()`).
+        """
+        if game.move_count < self.min_moves:
+            return None
+        regions = partition(game)
+        if regions is None or not regions[0]:
+            return None
+        masks = knight_masks(game.width, game.height)
+        height = game.height
+        best_move, best_length = None, -1
+        self._reset_budget(time_left, threshold)
+        for move in game.get_legal_moves():
+            idx = move[0] + move[1] * height
+            length = self._path_length(masks, idx, regions[0] & ~(1 << idx))
+            if length is None:
+                return None
+            if length > best_length:
+                best_move, best_length = move, length
+        return best_move
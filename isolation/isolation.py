@@ -9,10 +9,73 @@ be available to project reviewers.
 """
 import random
 import timeit
-from copy import copy
 
 TIME_LIMIT_MILLIS = 150
 
+# Cache of precomputed knight move tables for each (width, height) geometry
+_KNIGHT_TABLES = {}
+
+
+def _knight_tables(width, height):
+    """Build (or fetch from the cache) the knight move tables for a board of
+    the given size. Cells are indexed as `row + column * height`.
+    """
+    tables = _KNIGHT_TABLES.get((width, height))
+    if tables is None:
+        directions = [(-2, -1), (-2, 1), (-1, -2), (-1, 2),
+                      (1, -2), (1, 2), (2, -1), (2, 1)]
+        coords = tuple((idx % height, idx // height)
+                       for idx in range(width * height))
+        moves = tuple(tuple(r + dr + (c + dc) * height for dr, dc in directions
+                            if 0 <= r + dr < height and 0 <= c + dc < width)
+                      for r, c in coords)
+        masks = tuple(sum(1 << dest for dest in dests) for dests in moves)
+        tables = _KNIGHT_TABLES[(width, height)] = (coords, moves, masks)
+    return tables
+
+
+# Cache of Zobrist hashing keys for each (width, height) geometry
+_ZOBRIST_KEYS = {}
+
+
+def _zobrist_keys(width, height):
+    """Build (or fetch from the cache) the 64-bit Zobrist keys for a board of
+    the given size as a tuple (cell keys, (player 1 keys, player 2 keys),
+    side-to-move key). The keys are generated from a fixed seed so that hash
+    values are identical across processes and runs.
+    """
+    keys = _ZOBRIST_KEYS.get((width, height))
+    if keys is None:
+        rng = random.Random("zobrist-{}x{}".format(width, height))
+        size = width * height
+        keys = _ZOBRIST_KEYS[(width, height)] = (
+            tuple(rng.getrandbits(64) for _ in range(size)),
+            (tuple(rng.getrandbits(64) for _ in range(size)),
+             tuple(rng.getrandbits(64) for _ in range(size))),
+            rng.getrandbits(64))
+    return keys
+
+
+def cell_coords(width, height):
+    """Return a tuple mapping each cell index of a board with the given size
+    to its (row, column) coordinate pair.
+    """
+    return _knight_tables(width, height)[0]
+
+
+def knight_moves(width, height):
+    """Return a tuple mapping each cell index of a board with the given size
+    to a tuple of the cell indices a knight can reach from that cell.
+    """
+    return _knight_tables(width, height)[1]
+
+
+def knight_masks(width, height):
+    """Return a tuple mapping each cell index of a board with the given size
+    to a bitmask of the cells a knight can reach from that cell.
+    """
+    return _knight_tables(width, height)[2]
+
 
 class Board(object):
     """Implement a model for the game Isolation assuming each player moves like
@@ -33,10 +96,24 @@ class Board(object):
 
     height : int (optional)
         The number of rows that the board should have.
+
+    Attributes
+    ----------
+    shuffle_moves : bool
+        If True (the default), `get_legal_moves()` returns the moves in a
+        random order. Set it to False for reproducible move ordering; copies
+        of the board inherit the setting.
     """
     BLANK = 0
     NOT_MOVED = None
 
+    # Searches create a board for every node, so boards have no instance
+    # dict (subclasses that do not declare __slots__ still get one)
+    __slots__ = ("width", "height", "move_count", "_player_1", "_player_2",
+                 "_active_player", "_inactive_player", "shuffle_moves",
+                 "_board_state", "_coords", "_moves", "_zobrist", "_hash",
+                 "_undo_stack")
+
     def __init__(self, player_1, player_2, width=7, height=7):
         self.width = width
         self.height = height
@@ -45,15 +122,30 @@ class Board(object):
         self._player_2 = player_2
         self._active_player = player_1
         self._inactive_player = player_2
+        self.shuffle_moves = True
 
         # The last 3 entries of the board state includes initiative (0 for
         # player 1, 1 for player 2) player 2 last move, and player 1 last move
         self._board_state = [Board.BLANK] * (width * height + 3)
         self._board_state[-1] = Board.NOT_MOVED
         self._board_state[-2] = Board.NOT_MOVED
+        self._coords, self._moves, _ = _knight_tables(width, height)
+
+        # Zobrist hash of the blocked cells, player locations, and side to
+        # move; it is updated incrementally by every move
+        self._zobrist = _zobrist_keys(width, height)
+        self._hash = 0
+
+        # Stack of (cell index, player slot, previous location, previous hash)
+        # entries used by pop() to undo the moves applied with push()
+        self._undo_stack = []
 
     def hash(self):
-        return str(self._board_state).__hash__()
+        """Return a 64-bit Zobrist hash of the current state covering the
+        blocked cells, both player locations, and the player to move. The
+        hash is maintained incrementally, so this is a constant time call.
+        """
+        return self._hash
 
     @property
     def active_player(self):
@@ -92,11 +184,23 @@ class Board(object):
 
     def copy(self):
         """ Return a deep copy of the current board. """
-        new_board = Board(self._player_1, self._player_2, width=self.width, height=self.height)
+        # The copy is filled in directly instead of through __init__(), which
+        # would build a fresh state list only for it to be replaced
+        new_board = Board.__new__(Board)
+        new_board.width = self.width
+        new_board.height = self.height
         new_board.move_count = self.move_count
+        new_board._player_1 = self._player_1
+        new_board._player_2 = self._player_2
         new_board._active_player = self._active_player
         new_board._inactive_player = self._inactive_player
-        new_board._board_state = copy(self._board_state)
+        new_board.shuffle_moves = self.shuffle_moves
+        new_board._board_state = self._board_state[:]
+        new_board._coords = self._coords
+        new_board._moves = self._moves
+        new_board._zobrist = self._zobrist
+        new_board._hash = self._hash
+        new_board._undo_stack = []
         return new_board
 
     def forecast_move(self, move):
@@ -171,7 +275,7 @@ class Board(object):
         h = idx % self.height
         return (h, w)
 
-    def get_legal_moves(self, player=None):
+    def get_legal_moves(self, player=None, shuffle=None):
         """Return the list of all legal moves for the specified player.
 
         Parameters
@@ -180,6 +284,11 @@ class Board(object):
             An object registered as a player in the current game. If None,
             return the legal moves for the active player on the board.
 
+        shuffle : bool (optional)
+            Whether to return the moves in random order. If None, use the
+            `shuffle_moves` setting of the board. Callers that only need the
+            number of moves should pass False to skip the shuffle.
+
         Returns
         -------
         list<(int, int)>
@@ -188,7 +297,81 @@ class Board(object):
         """
         if player is None:
             player = self.active_player
-        return self.__get_moves(self.get_player_location(player))
+        if shuffle is None:
+            shuffle = self.shuffle_moves
+        return self.__get_moves(self.get_player_location(player), shuffle)
+
+    def _location_index(self, player):
+        """Return the cell index of the specified player (or NOT_MOVED)."""
+        if player == self._player_1:
+            return self._board_state[-1]
+        elif player == self._player_2:
+            return self._board_state[-2]
+        raise RuntimeError("Invalid player in mobility: {}".format(player))
+
+    def mobility(self, player=None):
+        """Return the number of legal moves for the specified player.
+
+        This is equal to `len(get_legal_moves(player))`, but the count is
+        taken directly from the knight move table without building (or
+        shuffling) the list of moves, so evaluation functions should prefer
+        it.
+
+        Parameters
+        ----------
+        player : object (optional)
+            An object registered as a player in the current game. If None,
+            count the legal moves of the active player on the board.
+
+        Returns
+        -------
+        int
+        """
+        if player is None:
+            player = self._active_player
+        loc = self._location_index(player)
+        board_state = self._board_state
+        if loc == Board.NOT_MOVED:
+            return board_state[:-3].count(Board.BLANK)
+        return [board_state[idx] for idx in self._moves[loc]].count(Board.BLANK)
+
+    def weighted_mobility(self, player=None):
+        """Return the number of second-order moves of the specified player,
+        i.e., the number of distinct open cells the player could reach with
+        two consecutive moves (through open cells) if the opponent did not
+        move.
+
+        Squares reachable in two moves are a finer measure of the room left
+        to a player than `mobility()`: a move into a corner and a move into
+        the open both count once in `mobility()`, but the second one adds
+        several cells here. The count is taken from the knight move tables
+        without building lists of moves.
+
+        Parameters
+        ----------
+        player : object (optional)
+            An object registered as a player in the current game. If None,
+            count the moves of the active player on the board.
+
+        Returns
+        -------
+        int
+            The number of second-order moves; for a player that has not
+            moved yet (and can move to any open cell) this is the number of
+            open cells.
+        """
+        if player is None:
+            player = self._active_player
+        loc = self._location_index(player)
+        board_state = self._board_state
+        if loc == Board.NOT_MOVED:
+            return board_state[:-3].count(Board.BLANK)
+        moves = self._moves
+        reachable = set()
+        for idx in moves[loc]:
+            if board_state[idx] == Board.BLANK:
+                reachable.update(moves[idx])
+        return [board_state[idx] for idx in reachable].count(Board.BLANK)
 
     def apply_move(self, move):
         """Move the active player to a specified location.
@@ -201,19 +384,60 @@ class Board(object):
         """
         idx = move[0] + move[1] * self.height
         last_move_idx = int(self.active_player == self._player_2) + 1
+        cell_keys, player_keys, side_key = self._zobrist
+        location_keys = player_keys[last_move_idx - 1]
+        last_move = self._board_state[-last_move_idx]
+        if last_move != Board.NOT_MOVED:
+            self._hash ^= location_keys[last_move]
+        self._hash ^= location_keys[idx] ^ cell_keys[idx] ^ side_key
         self._board_state[-last_move_idx] = idx
         self._board_state[idx] = 1
         self._board_state[-3] ^= 1
         self._active_player, self._inactive_player = self._inactive_player, self._active_player
         self.move_count += 1
 
+    def push(self, move):
+        """Apply a move in-place like `apply_move()`, but remember enough
+        information that the move can be undone by a matching call to `pop()`.
+
+        Using push()/pop() lets a search walk the game tree on a single board
+        instead of allocating a new copy for every node with forecast_move().
+
+        Parameters
+        ----------
+        move : (int, int)
+            A coordinate pair (row, column) indicating the next position for
+            the active player on the board.
+        """
+        last_move_idx = int(self.active_player == self._player_2) + 1
+        self._undo_stack.append((move[0] + move[1] * self.height, last_move_idx,
+                                 self._board_state[-last_move_idx], self._hash))
+        self.apply_move(move)
+
+    def pop(self):
+        """Undo the most recent move applied with `push()` and restore the
+        board to exactly the state it had before that move.
+
+        Returns
+        -------
+        (int, int)
+            The coordinate pair (row, column) of the move that was undone.
+        """
+        idx, last_move_idx, last_move, self._hash = self._undo_stack.pop()
+        self._board_state[idx] = Board.BLANK
+        self._board_state[-last_move_idx] = last_move
+        self._board_state[-3] ^= 1
+        self._active_player, self._inactive_player = self._inactive_player, self._active_player
+        self.move_count -= 1
+        return self._coords[idx]
+
     def is_winner(self, player):
         """ Test whether the specified player has won the game. """
-        return player == self._inactive_player and not self.get_legal_moves(self._active_player)
+        return player == self._inactive_player and not self.mobility(self._active_player)
 
     def is_loser(self, player):
         """ Test whether the specified player has lost the game. """
-        return player == self._active_player and not self.get_legal_moves(self._active_player)
+        return player == self._active_player and not self.mobility(self._active_player)
 
     def utility(self, player):
         """Returns the utility of the current game state from the perspective
@@ -237,7 +461,7 @@ class Board(object):
             a value of -inf if the player has lost, and a value of 0
             otherwise.
         """
-        if not self.get_legal_moves(self._active_player):
+        if not self.mobility(self._active_player):
 
             if player == self._inactive_player:
                 return float("inf")
@@ -247,19 +471,19 @@ class Board(object):
 
         return 0.
 
-    def __get_moves(self, loc):
+    def __get_moves(self, loc, shuffle=True):
         """Generate the list of possible moves for an L-shaped motion (like a
         knight in chess).
         """
         if loc == Board.NOT_MOVED:
             return self.get_blank_spaces()
 
-        r, c = loc
-        directions = [(-2, -1), (-2, 1), (-1, -2), (-1, 2),
-                      (1, -2), (1, 2), (2, -1), (2, 1)]
-        valid_moves = [(r + dr, c + dc) for dr, dc in directions
-                       if self.move_is_legal((r + dr, c + dc))]
-        random.shuffle(valid_moves)
+        coords = self._coords
+        board_state = self._board_state
+        valid_moves = [coords[idx] for idx in self._moves[loc[0] + loc[1] * self.height]
+                       if board_state[idx] == Board.BLANK]
+        if shuffle:
+            random.shuffle(valid_moves)
         return valid_moves
 
     def print_board(self):
@@ -295,7 +519,7 @@ class Board(object):
 
         return out
 
-    def play(self, time_limit=TIME_LIMIT_MILLIS):
+    def play(self, time_limit=TIME_LIMIT_MILLIS, game_time=None):
         """Execute a match between the players by alternately soliciting them
         to select a move and applying it in the game.
 
@@ -303,7 +527,14 @@ class Board(object):
         ----------
         time_limit : numeric (optional)
             The maximum number of milliseconds to allow before timeout
-            during each turn.
+            during each turn, or None for no limit on single turns (which
+            requires a `game_time`).
+
+        game_time : numeric (optional)
+            If set, the number of milliseconds on each player's clock for
+            the whole game. The time used by each turn is taken off the
+            player's clock, and `time_left` never reports more than the time
+            on the clock.
 
         Returns
         ----------
@@ -312,19 +543,30 @@ class Board(object):
             move history, and a string indicating the reason for losing
             (e.g., timeout or invalid move).
         """
+        if time_limit is None and game_time is None:
+            raise ValueError("A game needs a time_limit or a game_time")
+
         move_history = []
 
         time_millis = lambda: 1000 * timeit.default_timer()
+        clocks = [game_time, game_time]
 
         while True:
 
             legal_player_moves = self.get_legal_moves()
             game_copy = self.copy()
 
+            seat = self.move_count % 2
+            limit = float("inf") if time_limit is None else time_limit
+            if game_time is not None:
+                limit = min(limit, clocks[seat])
+
             move_start = time_millis()
-            time_left = lambda : time_limit - (time_millis() - move_start)
+            time_left = lambda : limit - (time_millis() - move_start)
             curr_move = self._active_player.get_move(game_copy, time_left)
             move_end = time_left()
+            if game_time is not None:
+                clocks[seat] -= limit - move_end
 
             if curr_move is None:
                 curr_move = Board.NOT_MOVED
@@ -0,0 +1,155 @@
+"""
+This file contains functions that map Isolation positions onto a canonical
+orientation of the board.
+
+Knight moves are preserved by every symmetry of the board: the eight
+rotations and reflections of a square board, or the four of a rectangular
+board (the identity, the two mirror images and the half turn). Positions
+that are images of each other under a symmetry have the same game tree up
+to relabelling the cells, so caches keyed by `canonical_hash()` instead of
+`Board.hash()` can share a single entry between them.
+
+Symmetries are numbered from 0 (the identity) and act on cell indices
+(`row + column * height`) through the permutations from `symmetries()`.
+"""
+from .isolation import Board, _zobrist_keys
+
+# Cache of (cell permutations, inverse permutations) for each geometry
+_SYMMETRIES = {}
+
+
+def _tables(width, height):
+    """Build (or fetch from the cache) the cell permutations of the
+    symmetries of a board with the given size and their inverses.
+    """
+    tables = _SYMMETRIES.get((width, height))
+    if tables is None:
+        w, h = width - 1, height - 1
+        maps = [lambda r, c: (r, c), lambda r, c: (h - r, c),
+                lambda r, c: (r, w - c), lambda r, c: (h - r, w - c)]
+        if width == height:
+            maps += [lambda r, c: (c, r), lambda r, c: (w - c, h - r),
+                     lambda r, c: (c, h - r), lambda r, c: (w - c, r)]
+        perms = []
+        for fn in maps:
+            perm = [0] * (width * height)
+            for c in range(width):
+                for r in range(height):
+                    row, col = fn(r, c)
+                    perm[r + c * height] = row + col * height
+            perms.append(tuple(perm))
+        inverses = []
+        for perm in perms:
+            inverse = [0] * len(perm)
+            for idx, dest in enumerate(perm):
+                inverse[dest] = idx
+            inverses.append(tuple(inverse))
+        tables = _SYMMETRIES[(width, height)] = (tuple(perms), tuple(inverses))
+    return tables
+
+
+def symmetries(width, height):
+    """Return a tuple holding, for every symmetry of a board with the given
+    size (the identity first), a tuple mapping each cell index to the index
+    of its image. Square boards have 8 symmetries and other boards have 4.
+    """
+    return _tables(width, height)[0]
+
+
+def transform_move(move, symmetry, width, height, inverse=False):
+    """Return the image of the cell `move` (a (row, column) pair) under the
+    given symmetry, or under its inverse if `inverse` is True.
+    """
+    perms = _tables(width, height)[1 if inverse else 0]
+    idx = perms[symmetry][move[0] + move[1] * height]
+    return (idx % height, idx // height)
+
+
+def _state(game):
+    """Return the tuple (blocked cell indices, player 1 cell index, player 2
+    cell index) for an `isolation.Board` or `isolation.BitBoard`; the player
+    indices are NOT_MOVED for players that have not moved yet.
+    """
+    size = game.width * game.height
+    if hasattr(game, "_occupied"):
+        occupied = game._occupied
+        blocked = [idx for idx in range(size) if occupied >> idx & 1]
+        return blocked, game._p1_loc, game._p2_loc
+    state = game._board_state
+    blocked = [idx for idx in range(size) if state[idx]]
+    return blocked, state[-1], state[-2]
+
+
+def canonical_hash(game):
+    """Return the pair (hash, symmetry), where hash is the smallest Zobrist
+    hash of the position of `game` over the symmetries of the board (so it is
+    the same for every image of the position) and symmetry is the index of a
+    symmetry that maps the position onto the canonical orientation.
+
+    Parameters
+    ----------
+    game : isolation.Board
+        An instance of `isolation.Board` or `isolation.BitBoard`.
+
+    Returns
+    -------
+    (int, int)
+    """
+    blocked, p1_loc, p2_loc = _state(game)
+    cell_keys, (p1_keys, p2_keys), side_key = _zobrist_keys(game.width, game.height)
+    side = side_key if game.move_count & 1 else 0
+    best = None
+    for symmetry, perm in enumerate(symmetries(game.width, game.height)):
+        key = side
+        for idx in blocked:
+            key ^= cell_keys[perm[idx]]
+        if p1_loc is not Board.NOT_MOVED:
+            key ^= p1_keys[perm[p1_loc]]
+        if p2_loc is not Board.NOT_MOVED:
+            key ^= p2_keys[perm[p2_loc]]
+        if best is None or key < best[0]:
+            best = (key, symmetry)
+    return best
+
+
+def canonicalize(game):
+    """Return the pair (board, symmetry), where board is a copy of `game` in
+    the canonical orientation (its `hash()` is the canonical hash) and
+    symmetry is the index of the symmetry that maps `game` onto it. Moves
+    found on the canonical board map back to `game` with
+    `transform_move(move, symmetry, width, height, inverse=True)`.
+
+    Parameters
+    ----------
+    game : isolation.Board
+        An instance of `isolation.Board` or `isolation.BitBoard`.
+
+    Returns
+    -------
+    (isolation.Board, int)
+    """
+    key, symmetry = canonical_hash(game)
+    perm = symmetries(game.width, game.height)[symmetry]
+    blocked, p1_loc, p2_loc = _state(game)
+    if p1_loc is not Board.NOT_MOVED:
+        p1_loc = perm[p1_loc]
+    if p2_loc is not Board.NOT_MOVED:
+        p2_loc = perm[p2_loc]
+
+    board = game.copy()
+    if hasattr(board, "_occupied"):
+        occupied = 0
+        for idx in blocked:
+            occupied |= 1 << perm[idx]
+        board._occupied = occupied
+        board._p1_loc, board._p2_loc = p1_loc, p2_loc
+    else:
+        state = board._board_state
+        for idx in blocked:
+            state[idx] = Board.BLANK
+        for idx in blocked:
+            state[perm[idx]] = 1
+        state[-1], state[-2] = p1_loc, p2_loc
+    board._hash = key
+    board._undo_stack = []
+    return board, symmetry
@@ -0,0 +1,182 @@
+"""Build an opening book by searching the positions at the start of the game
+offline, with far more time per position than an agent has during a game.
+
+Every position reachable in the first few plies is searched once per
+symmetry class (positions that are rotations or reflections of each other
+share a book entry), and the chosen moves are written to a compact binary
+file that `isolation.OpeningBook.load()` reads back. Pass the loaded book to
+`AlphaBetaPlayer(book=...)` or `CustomPlayer(book=...)`, or to every agent
+in a tournament with `python tournament.py --book FILE`.
+
+Example: python opening_book.py 3 --time 1000 --workers 4 --output book.bin
+"""
+import argparse
+import sys
+import timeit
+
+from concurrent.futures import ProcessPoolExecutor
+
+from isolation import Board, OpeningBook
+from isolation.symmetry import canonical_hash
+from sample_players import improved_score
+from game_agent import (AlphaBetaPlayer, TranspositionTable, custom_score,
+                        custom_score_2, custom_score_3)
+
+SCORERS = {
+    "improved_score": improved_score,
+    "custom_score": custom_score,
+    "custom_score_2": custom_score_2,
+    "custom_score_3": custom_score_3,
+}
+
+
+def positions(plies, width=7, height=7):
+    """Return the move sequences leading to one position of every symmetry
+    class reachable in fewer than `plies` moves, in order of length. Positions
+    where the player to move has fewer than two legal moves are skipped.
+    """
+    seen = set()
+    frontier = [[]]
+    results = []
+    for ply in range(plies):
+        next_frontier = []
+        for history in frontier:
+            game = build(history, width, height)
+            moves = game.get_legal_moves(shuffle=False)
+            if len(moves) > 1:
+                results.append(history)
+            if ply + 1 == plies:
+                continue
+            for move in moves:
+                child = game.forecast_move(move)
+                key, _ = canonical_hash(child)
+                if key not in seen:
+                    seen.add(key)
+                    next_frontier.append(history + [move])
+        frontier = next_frontier
+    return results
+
+
+def build(history, width=7, height=7, player=None):
+    """Return a board with the moves in `history` applied; `player` (if
+    given) takes the seat of the player to move.
+    """
+    if player is None:
+        game = Board("Player1", "Player2", width, height)
+    elif len(history) % 2:
+        game = Board("Player1", player, width, height)
+    else:
+        game = Board(player, "Player2", width, height)
+    for move in history:
+        game.apply_move(move)
+    return game
+
+
+def search(task):
+    """Search the position reached by a move sequence for `time_limit`
+    milliseconds and return the chosen move.
+
+    This function runs in a worker process when the book is built in
+    parallel, so the task holds the names of the options rather than objects.
+
+    Parameters
+    ----------
+    task : (list<(int, int)>, float, str, int, int)
+        The move sequence, the search time (in milliseconds), the name of the
+        evaluation function, and the board width and height.
+    """
+    history, time_limit, score, width, height = task
+    agent = AlphaBetaPlayer(score_fn=SCORERS[score], tt=TranspositionTable(),
+                            tt_persist=False, move_ordering=True,
+                            search_mode="pvs")
+    game = build(history, width, height, agent)
+    end = timeit.default_timer() + time_limit / 1000
+    return agent.get_move(game, lambda: 1000 * (end - timeit.default_timer()))
+
+
+def build_book(plies, time_limit, score="custom_score", width=7, height=7,
+               workers=1, progress=None):
+    """Search every position of the first `plies` moves and return the book.
+
+    Parameters
+    ----------
+    plies : int
+        The number of moves covered by the book.
+
+    time_limit : float
+        The search time (in milliseconds) spent on each position.
+
+    score : str (optional)
+        The name of the evaluation function used by the searches.
+
+    width, height : int (optional)
+        The size of the board.
+
+    workers : int (optional)
+        The number of processes used to search positions.
+
+    progress : callable (optional)
+        A function called with the number of positions searched so far and
+        the total number of positions after every search.
+
+    Returns
+    -------
+    isolation.OpeningBook
+    """
+    book = OpeningBook(width, height, plies)
+    histories = positions(plies, width, height)
+    tasks = [(history, time_limit, score, width, height) for history in histories]
+    if workers > 1:
+        pool = ProcessPoolExecutor(workers)
+        moves = pool.map(search, tasks)
+    else:
+        pool = None
+        moves = map(search, tasks)
+    try:
+        for count, (history, move) in enumerate(zip(histories, moves), 1):
+            # Searches that ran out of time before finishing a pass return
+            # (-1, -1) and are left out of the book
+            game = build(history, width, height)
+            if move in game.get_legal_moves():
+                book.store(game, move)
+            if progress is not None:
+                progress(count, len(histories))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return book
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("plies", type=int,
+                        help="number of moves at the start of the game to cover")
+    parser.add_argument("--time", type=float, default=1000.,
+                        help="search time per position in milliseconds")
+    parser.add_argument("--score", choices=sorted(SCORERS), default="custom_score",
+                        help="evaluation function used by the searches")
+    parser.add_argument("--width", type=int, default=7)
+    parser.add_argument("--height", type=int, default=7)
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of processes used to search positions")
+    parser.add_argument("--output", default="opening_book.bin",
+                        help="file to write the book to")
+    args = parser.parse_args()
+
+    if args.plies < 1:
+        parser.error("plies must be at least 1")
+
+    def progress(count, total):
+        sys.stdout.write("\rSearched {} of {} positions".format(count, total))
+        sys.stdout.flush()
+
+    start = timeit.default_timer()
+    book = build_book(args.plies, args.time, args.score, args.width,
+                      args.height, args.workers, progress)
+    book.save(args.output)
+    print("\nWrote {} positions to {} in {:.1f}s".format(
+        len(book), args.output, timeit.default_timer() - start))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""Count the leaf nodes of the game tree below a position to a fixed depth.
+
+Perft ("performance test") walks every line of play to exactly `depth` plies
+and counts the positions reached (lines that end earlier because a player has
+no legal moves do not count). The counts depend only on the rules of the
+game, so they verify that a board implementation generates exactly the same
+game tree as the reference list-based `isolation.Board`, and the time taken
+measures the speed of move generation and move application.
+
+Example: python perft.py 4 --moves 3,3 2,4 --divide --check
+"""
+import argparse
+import sys
+import timeit
+
+from isolation import Board, BitBoard
+
+BOARDS = {"board": Board, "bitboard": BitBoard}
+
+
+def perft(game, depth, in_place=False):
+    """Return the number of positions exactly `depth` plies below `game`.
+
+    Parameters
+    ----------
+    game : isolation.Board
+        An instance of `isolation.Board` (or of a compatible board class).
+
+    depth : int
+        The number of plies to search.
+
+    in_place : bool (optional)
+        If True, walk the tree on `game` itself with `push()`/`pop()`;
+        otherwise create every child with `forecast_move()`.
+
+    Returns
+    -------
+    int
+        The number of leaf positions.
+    """
+    if depth == 0:
+        return 1
+    moves = game.get_legal_moves(shuffle=False)
+    if depth == 1:
+        return len(moves)
+    count = 0
+    if in_place:
+        for move in moves:
+            game.push(move)
+            count += perft(game, depth - 1, True)
+            game.pop()
+    else:
+        for move in moves:
+            count += perft(game.forecast_move(move), depth - 1)
+    return count
+
+
+def divide(game, depth, in_place=False):
+    """Return a list of (move, count) pairs giving the perft count below each
+    legal move of `game` (so the counts sum to `perft(game, depth)`), sorted
+    by move.
+    """
+    results = []
+    for move in sorted(game.get_legal_moves(shuffle=False)):
+        if in_place:
+            game.push(move)
+            results.append((move, perft(game, depth - 1, True)))
+            game.pop()
+        else:
+            results.append((move, perft(game.forecast_move(move), depth - 1)))
+    return results
+
+
+def build(board_class, moves, width=7, height=7):
+    """Return a board of the given class with `moves` applied in order."""
+    game = board_class("Player1", "Player2", width, height)
+    for move in moves:
+        if not game.move_is_legal(move) or (
+                game.move_count >= 2 and move not in game.get_legal_moves()):
+            raise ValueError("Illegal move in position: {}".format(move))
+        game.apply_move(move)
+    return game
+
+
+def timed_divide(board_class, moves, depth, in_place, width, height):
+    """Return the divide results and the time (in seconds) taken to compute
+    them from the given position with boards of the given class.
+    """
+    game = build(board_class, moves, width, height)
+    start = timeit.default_timer()
+    results = divide(game, depth, in_place)
+    return results, timeit.default_timer() - start
+
+
+def parse_move(text):
+    """Parse a move written as "row,column"."""
+    row, col = text.split(",")
+    return int(row), int(col)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("depth", type=int, help="number of plies to search")
+    parser.add_argument("--moves", nargs="*", type=parse_move, default=[],
+                        help="moves (row,column) played to reach the position")
+    parser.add_argument("--width", type=int, default=7)
+    parser.add_argument("--height", type=int, default=7)
+    parser.add_argument("--board", choices=sorted(BOARDS), default="board",
+                        help="board implementation to run")
+    parser.add_argument("--in-place", action="store_true",
+                        help="walk the tree with push()/pop()")
+    parser.add_argument("--divide", action="store_true",
+                        help="print the count below each root move")
+    parser.add_argument("--check", action="store_true",
+                        help="compare every board implementation and walk "
+                             "mode against the reference Board")
+    args = parser.parse_args()
+
+    if args.depth < 1:
+        parser.error("depth must be at least 1")
+    try:
+        build(Board, args.moves, args.width, args.height)
+    except ValueError as error:
+        parser.error(str(error))
+
+    if args.check:
+        # The reference Board with copy-based moves runs first
+        configs = [(name, in_place) for name in ("board", "bitboard")
+                   for in_place in (False, True)]
+    else:
+        configs = [(args.board, args.in_place)]
+
+    reference = None
+    failed = False
+    for name, in_place in configs:
+        results, elapsed = timed_divide(BOARDS[name], args.moves, args.depth,
+                                        in_place, args.width, args.height)
+        nodes = sum(count for _, count in results)
+        label = "{}{}".format(name, " (in place)" if in_place else "")
+        if args.divide:
+            print("{}:".format(label))
+            for move, count in results:
+                print("  {!s:<10}{:>14}".format(move, count))
+        print("{:<22} depth {:<3} nodes {:>14}  time {:>9.3f}s  nodes/sec {:>12.0f}".format(
+            label, args.depth, nodes, elapsed, nodes / elapsed if elapsed else 0.))
+
+        if args.check:
+            if reference is None:
+                reference = dict(results)
+            for move, count in results:
+                if reference.get(move) != count:
+                    failed = True
+                    print("  MISMATCH {}: {} (expected {})".format(
+                        move, count, reference.get(move)))
+            if set(reference) != {move for move, _ in results}:
+                failed = True
+                print("  MISMATCH: different root moves")
+
+    if args.check:
+        print("FAILED" if failed else "OK")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
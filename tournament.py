@@ -11,17 +11,20 @@ players, and the players play each match twice -- once as the first player and
 once as the second player.  Randomizing the openings and switching the player
 order corrects for imbalances due to both starting position and initiative.
 """
+import argparse
 import itertools
+import json
 import random
 import warnings
 
 from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
-from isolation import Board
+from isolation import Board, OpeningBook
 from sample_players import (RandomPlayer, open_move_score,
                             improved_score, center_score)
-from game_agent import (MinimaxPlayer, AlphaBetaPlayer, custom_score,
-                        custom_score_2, custom_score_3)
+from game_agent import (MinimaxPlayer, AlphaBetaPlayer, SearchStats,
+                        custom_score, custom_score_2, custom_score_3)
 
 NUM_MATCHES = 5  # number of matches against each opponent
 TIME_LIMIT = 150  # number of milliseconds before timeout
@@ -35,38 +38,146 @@ game_agent.py.
 """
 
 Agent = namedtuple("Agent", ["player", "name"])
+Task = namedtuple("Task", ["agents", "test_seat", "opening", "seed"])
 
 
-def play_round(cpu_agent, test_agents, win_counts, num_matches):
+def timed_get_move(player, log):
+    """Return a replacement for the get_move() method of a player that appends
+    the time used (in milliseconds), the search depth reached and the
+    `SearchStats` instance of each move to `log` (the depth and statistics
+    are None for players that do not report them).
+
+    The wrapper runs on the player's clock, so it only keeps the statistics
+    of the move and gives the player a fresh instance for the next move;
+    they are converted to dicts by the caller once the game is over.
+    """
+    get_move = player.get_move
+
+    def wrapper(game, time_left):
+        start = time_left()
+        move = get_move(game, time_left)
+        elapsed = start - time_left()
+        stats = getattr(player, "stats", None)
+        log.append((elapsed, getattr(player, "depth_reached", None), stats))
+        if stats is not None:
+            player.stats = SearchStats()
+        return move
+    return wrapper
+
+
+def play_game(task):
+    """Play a single game from its opening position and report the result.
+
+    This function runs in a worker process when the tournament is played in
+    parallel, so the players it receives are copies of the tournament agents.
+    The random module is seeded with the game seed before play begins, so a
+    game depends only on its task (and on the timing of the agents).
+
+    Parameters
+    ----------
+    task : Task
+        The agents in seat order, the seat of the test agent, the opening
+        moves to apply before play begins, and the random seed for the game.
+
+    Returns
+    -------
+    dict
+        A JSON serializable record of the game: the agent names in seat
+        order, the seat of the test agent and of the winner, the opening,
+        the seed, the move history and termination reason returned by
+        `Board.play`, and the time used (in milliseconds), depth reached and
+        search statistics (see `game_agent.SearchStats`) of every call to
+        get_move(), including a final call that timed out or returned an
+        illegal move.
+    """
+    players = [agent.player for agent in task.agents]
+    random.seed(task.seed)
+    game = Board(*players)
+    for move in task.opening:
+        game.apply_move(move)
+
+    log = []
+    stats = [getattr(player, "stats", None) for player in players]
+    for player in players:
+        player.get_move = timed_get_move(player, log)
+    try:
+        winner, history, termination = game.play(time_limit=TIME_LIMIT)
+    finally:
+        for player, player_stats in zip(players, stats):
+            del player.get_move
+            if player_stats is not None:
+                player.stats = player_stats
+
+    return {
+        "agents": [agent.name for agent in task.agents],
+        "test_seat": task.test_seat,
+        "winner": players.index(winner),
+        "termination": termination,
+        "seed": task.seed,
+        "opening": [list(move) for move in task.opening],
+        "history": history,
+        "move_times": [round(elapsed, 3) for elapsed, _, _ in log],
+        "depths": [depth for _, depth, _ in log],
+        "stats": [stats.as_dict() if stats is not None else None
+                  for _, _, stats in log],
+    }
+
+
+def play_round(cpu_agent, test_agents, win_counts, num_matches, rng=random,
+               pool=None, results=None):
     """Compare the test agents to the cpu agent in "fair" matches.
 
     "Fair" matches use random starting locations and force the agents to
     play as both first and second player to control for advantages resulting
     from choosing better opening moves or having first initiative to move.
+
+    Openings and per-game seeds are drawn from `rng`, and the games are played
+    by `pool` (a `concurrent.futures.Executor`) if one is given; the results
+    are tallied in the order the games were scheduled, so the totals do not
+    depend on the order in which parallel games finish. If `results` is an
+    open file, the record of every game (see `play_game()`) is written to it
+    as a line of JSON as soon as the game finishes.
     """
-    timeout_count = 0
-    forfeit_count = 0
+    tasks = []
     for _ in range(num_matches):
 
-        games = sum([[Board(cpu_agent.player, agent.player),
-                      Board(agent.player, cpu_agent.player)]
-                    for agent in test_agents], [])
-
         # initialize all games with a random move and response
+        opening = []
+        game = Board(cpu_agent.player, test_agents[0].player)
         for _ in range(2):
-            move = random.choice(games[0].get_legal_moves())
-            for game in games:
-                game.apply_move(move)
-
-        # play all games and tally the results
-        for game in games:
-            winner, _, termination = game.play(time_limit=TIME_LIMIT)
-            win_counts[winner] += 1
+            move = rng.choice(game.get_legal_moves(shuffle=False))
+            game.apply_move(move)
+            opening.append(move)
+
+        for agent in test_agents:
+            for agents, test_seat in [((cpu_agent, agent), 1),
+                                      ((agent, cpu_agent), 0)]:
+                tasks.append(Task(agents, test_seat, opening, rng.getrandbits(32)))
+
+    # play all games, streaming each record as soon as its game finishes
+    records = [None] * len(tasks)
+    if pool:
+        futures = {pool.submit(play_game, task): idx for idx, task in enumerate(tasks)}
+        finished = ((futures[future], future.result())
+                    for future in as_completed(futures))
+    else:
+        finished = ((idx, play_game(task)) for idx, task in enumerate(tasks))
+    for idx, record in finished:
+        records[idx] = record
+        if results is not None:
+            results.write(json.dumps(record) + "\n")
+            results.flush()
+
+    # tally the results
+    timeout_count = 0
+    forfeit_count = 0
+    for task, record in zip(tasks, records):
+        win_counts[task.agents[record["winner"]].player] += 1
 
-            if termination == "timeout":
-                timeout_count += 1
-            elif termination == "forfeit":
-                forfeit_count += 1
+        if record["termination"] == "timeout":
+            timeout_count += 1
+        elif record["termination"] == "forfeit":
+            forfeit_count += 1
 
     return timeout_count, forfeit_count
 
@@ -77,8 +188,18 @@ def update(total_wins, wins):
     return total_wins
 
 
-def play_matches(cpu_agents, test_agents, num_matches):
-    """Play matches between the test agent and each cpu_agent individually. """
+def play_matches(cpu_agents, test_agents, num_matches, workers=1, seed=None,
+                 results=None):
+    """Play matches between the test agent and each cpu_agent individually.
+
+    Games are played in a pool of `workers` processes when `workers` is
+    greater than one. The openings and per-game seeds are drawn from a random
+    generator seeded with `seed`, so the same seed schedules the same games
+    for any number of workers. If `results` is an open file, a JSON record
+    of every game is streamed to it (see `play_round()`).
+    """
+    rng = random.Random(seed)
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
     total_wins = {agent.player: 0 for agent in test_agents}
     total_timeouts = 0.
     total_forfeits = 0.
@@ -93,7 +214,8 @@ def play_matches(cpu_agents, test_agents, num_matches):
 
         print("{!s:^9}{:^13}".format(idx + 1, agent.name), end="", flush=True)
 
-        counts = play_round(agent, test_agents, wins, num_matches)
+        counts = play_round(agent, test_agents, wins, num_matches, rng, pool,
+                            results)
         total_timeouts += counts[0]
         total_forfeits += counts[1]
         total_wins = update(total_wins, wins)
@@ -106,6 +228,9 @@ def play_matches(cpu_agents, test_agents, num_matches):
             ) for i in range(0, len(round_totals), 2)
         ]))
 
+    if pool:
+        pool.shutdown()
+
     print("-" * 74)
     print('{:^9}{:^13}'.format("", "Win Rate:") +
         ''.join([
@@ -125,6 +250,19 @@ def play_matches(cpu_agents, test_agents, num_matches):
 
 
 def main():
+    parser = argparse.ArgumentParser(description=DESCRIPTION)
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of processes used to play games")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="random seed for the openings and games")
+    parser.add_argument("--results", default=None,
+                        help="file to append a JSON line per finished game to")
+    parser.add_argument("--stats", action="store_true",
+                        help="record search statistics in the results file")
+    parser.add_argument("--book", default=None,
+                        help="opening book file (see opening_book.py) given "
+                             "to every agent that can use one")
+    args = parser.parse_args()
 
     # Define two agents to compare -- these agents will play from the same
     # starting position against the same adversaries in the tournament
@@ -146,11 +284,27 @@ def main():
         Agent(AlphaBetaPlayer(score_fn=improved_score), "AB_Improved")
     ]
 
+    if args.stats:
+        for agent in test_agents + cpu_agents:
+            if hasattr(agent.player, "stats"):
+                agent.player.stats = SearchStats()
+
+    if args.book is not None:
+        book = OpeningBook.load(args.book)
+        for agent in test_agents + cpu_agents:
+            if hasattr(agent.player, "book"):
+                agent.player.book = book
+
     print(DESCRIPTION)
     print("{:^74}".format("*************************"))
     print("{:^74}".format("Playing Matches"))
     print("{:^74}".format("*************************"))
-    play_matches(cpu_agents, test_agents, NUM_MATCHES)
+    if args.results is None:
+        play_matches(cpu_agents, test_agents, NUM_MATCHES, args.workers, args.seed)
+    else:
+        with open(args.results, "a") as results:
+            play_matches(cpu_agents, test_agents, NUM_MATCHES, args.workers,
+                         args.seed, results)
 
 
 if __name__ == "__main__":